@@ -0,0 +1,238 @@
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from simulation import metrics_writer
+from simulation.base_station import BaseStation
+from simulation.environment import Environment
+from simulation.metrics import ThroughputTracker
+from simulation.mobility import TargetMobility
+from simulation.rl_environment import MobileNetworkRLEnv
+from simulation.runner import SimulationRunner
+from simulation.user_equipment import UserEquipment
+
+# Micro/macro benchmarks of the simulation hot paths. Each case is a setup
+# function taking (num_ues, num_bs) and returning the callable that is timed;
+# `axes` says which of the two sizes the case is swept over.
+QUICK_UES = [10, 100, 1000]
+QUICK_BS = [5, 50]
+FULL_UES = [10, 100, 1000, 10000, 100000]
+FULL_BS = [5, 50, 500]
+SEED = 1234
+CASES = {}
+
+
+def case(axes=()):
+    def register(setup):
+        CASES[setup.__name__] = (setup, axes)
+        return setup
+    return register
+
+
+def base_stations(num_bs, num_squares=20):
+    stations = []
+    for _ in range(num_bs):
+        bs = BaseStation(random.randint(100, 3000), random.randint(100, 3000))
+        bs.add_squares(num_squares)
+        stations.append(bs)
+    return stations
+
+
+def scenario(num_ues, num_bs):
+    env = Environment(mobility=TargetMobility(seed=SEED))
+    for bs in base_stations(num_bs):
+        env.add_base_station(bs)
+    ues = env.user_equipments
+    for _ in range(num_ues):
+        ues.add(random.randint(0, 3000), random.randint(0, 3000), random.randint(100, 900), random.randint(100, 700))
+    return env
+
+
+def random_ue():
+    return UserEquipment(random.randint(0, 3000), random.randint(0, 3000), random.randint(100, 900), random.randint(100, 700))
+
+
+@case()
+def signal_strength(num_ues, num_bs):
+    bs, ue = base_stations(1, 0)[0], random_ue()
+    return lambda: bs.signal_strength(ue)
+
+
+@case()
+def ue_move(num_ues, num_bs):
+    return random_ue().move
+
+
+@case(axes=("bs",))
+def ue_update_signal_strength(num_ues, num_bs):
+    stations, ue = base_stations(num_bs), random_ue()
+    return lambda: ue.update_signal_strength(stations)
+
+
+@case()
+def add_squares(num_ues, num_bs):
+    return lambda: BaseStation(random.randint(100, 3000), random.randint(100, 3000)).add_squares(20)
+
+
+@case(axes=("ues", "bs"))
+def link_budget_update(num_ues, num_bs):
+    env = scenario(num_ues, num_bs)
+    return lambda: env.link_budget.update(env.user_equipments)
+
+
+@case(axes=("ues", "bs"))
+def environment_update(num_ues, num_bs):
+    return scenario(num_ues, num_bs).update
+
+
+@case(axes=("ues", "bs"))
+def runner_metrics(num_ues, num_bs):
+    # one radio pass shared by the dynamic and regular PRB policies, plus the trackers
+    return SimulationRunner(scenario(num_ues, num_bs)).calculate_metrics
+
+
+@case(axes=("bs",))
+def rl_step(num_ues, num_bs):
+    env = MobileNetworkRLEnv(num_base_stations=num_bs)
+    return lambda: env.step(random.choice([0, 1]))
+
+
+@case(axes=("bs",))
+def rl_reset(num_ues, num_bs):
+    return MobileNetworkRLEnv(num_base_stations=num_bs).reset
+
+
+@case()
+def throughput_csv_writer(num_ues, num_bs):
+    tracker = ThroughputTracker()
+    counter = iter(range(10**12))
+    return lambda: tracker.write_handover_to_csv(0, "Normal", next(counter), 300.0, 1, 120.5, 1.2)
+
+
+def cold_start(statement):
+    # a fresh interpreter per run, so every import and initialization cost is paid again
+    command = [sys.executable, "-c", statement]
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+    return lambda: subprocess.run(command, env=env, check=True)
+
+
+@case()
+def cold_import_simulation(num_ues, num_bs):
+    return cold_start("import simulation")
+
+
+@case()
+def cold_start_runner(num_ues, num_bs):
+    return cold_start("from simulation.runner import SimulationRunner; SimulationRunner(max_time_steps=1).run()")
+
+
+@case()
+def cold_start_sweep_worker(num_ues, num_bs):
+    return cold_start("from simulation.sweep import DEFAULTS, run_scenario; run_scenario(dict(DEFAULTS, seed=0, max_time_steps=1))")
+
+
+def sizes(axes, ue_counts, bs_counts):
+    ue_counts = ue_counts if "ues" in axes else [None]
+    bs_counts = bs_counts if "bs" in axes else [None]
+    return [(n, b) for n in ue_counts for b in bs_counts]
+
+
+def case_key(name, num_ues, num_bs):
+    params = [f"ues={num_ues}"] if num_ues is not None else []
+    params += [f"bs={num_bs}"] if num_bs is not None else []
+    return f"{name}[{','.join(params)}]" if params else name
+
+
+def measure(setup, num_ues, num_bs, min_time, min_runs):
+    random.seed(SEED)
+    np.random.seed(SEED)
+    tracemalloc.start()
+    run = setup(num_ues or 1, num_bs or 5)
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    random.seed(SEED)
+    np.random.seed(SEED)
+    run = setup(num_ues or 1, num_bs or 5)
+    runs = 0
+    start = time.perf_counter()
+    while runs < min_runs or time.perf_counter() - start < min_time:
+        run()
+        runs += 1
+    elapsed = time.perf_counter() - start
+    return {"ops_per_s": runs / elapsed, "mean_s": elapsed / runs, "runs": runs, "peak_memory_bytes": peak}
+
+
+def run_benchmarks(names, ue_counts, bs_counts, min_time=0.2, min_runs=3):
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        cwd = os.getcwd()
+        os.chdir(directory)  # the CSV writers write relative to the working directory
+        metrics_writer.set_output_format("csv")
+        try:
+            for name in names:
+                setup, axes = CASES[name]
+                for num_ues, num_bs in sizes(axes, ue_counts, bs_counts):
+                    key = case_key(name, num_ues, num_bs)
+                    results[key] = measure(setup, num_ues, num_bs, min_time, min_runs)
+                    print(f"{key:45s} {results[key]['ops_per_s']:14.1f} ops/s "
+                          f"{results[key]['peak_memory_bytes'] / 2**20:9.2f} MiB peak", flush=True)
+                    metrics_writer.close_all()
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for key, result in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        ratio = result["ops_per_s"] / reference["ops_per_s"]
+        flag = "REGRESSION" if ratio < 1 - tolerance else ""
+        print(f"{key:45s} {ratio:6.2f}x baseline {flag}")
+        if flag:
+            regressions.append(key)
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the simulation hot paths.")
+    parser.add_argument("cases", nargs="*", help=f"cases to run (default: all of {', '.join(CASES)})")
+    parser.add_argument("--full", action="store_true", help="sweep up to 100k UEs and 500 base stations")
+    parser.add_argument("--ues", type=int, nargs="+")
+    parser.add_argument("--bs", type=int, nargs="+")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds to time each case for")
+    parser.add_argument("--save", help="write results as JSON")
+    parser.add_argument("--baseline", help="compare against a JSON file written by --save")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown before flagging")
+    args = parser.parse_args()
+    unknown = set(args.cases) - set(CASES)
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(sorted(unknown))}")
+
+    ue_counts = args.ues or (FULL_UES if args.full else QUICK_UES)
+    bs_counts = args.bs or (FULL_BS if args.full else QUICK_BS)
+    results = run_benchmarks(args.cases or list(CASES), ue_counts, bs_counts, args.min_time)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"python": platform.python_version(), "numpy": np.__version__,
+                       "machine": platform.machine(), "results": results}, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f)["results"], args.tolerance)
+        sys.exit(1 if regressions else 0)
@@ -1,77 +1,159 @@
-from PyQt6.QtWidgets import QGraphicsView, QGraphicsScene, QGraphicsEllipseItem, QGraphicsLineItem, QGraphicsTextItem, QGraphicsRectItem
-from PyQt6.QtCore import Qt, QPointF
-from PyQt6.QtGui import QPen, QBrush, QPainter, QFont  
-import numpy as np
-
-class NetworkView(QGraphicsView):
-    def __init__(self, env):
-        super().__init__()
-        self.env = env
-        self.scene = QGraphicsScene(self)
-        self.setScene(self.scene)
-        self.setRenderHint(QPainter.RenderHint.Antialiasing)
-        self.setDragMode(QGraphicsView.DragMode.RubberBandDrag)
-        self.setSceneRect(-1000, -1000, 6000, 6000)  
-        self.populate_scene()
-        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-
-    def populate_scene(self):
-        self.scene.clear()
-        
-        for i, bs in enumerate(self.env.base_stations):
-            label = chr(ord('A') + i)  
-            self.scene.addEllipse(bs.x - 5, bs.y - 5, 25, 25, 
-                                  QPen(Qt.GlobalColor.blue), 
-                                  QBrush(Qt.GlobalColor.blue))
-            self.scene.addText(label, QFont("Arial", 12)).setPos(bs.x + 10, bs.y - 10)  
-            coverage_radius = 1000
-            coverage_area = QGraphicsEllipseItem(bs.x - coverage_radius, bs.y - coverage_radius, 
-                                                 2 * coverage_radius, 2 * coverage_radius)
-            coverage_area.setPen(QPen(Qt.GlobalColor.red, 1, Qt.PenStyle.DashLine)) 
-            coverage_area.setBrush(Qt.GlobalColor.transparent)
-            self.scene.addItem(coverage_area)
-            
-            for square in bs.squares: 
-                square_item = QGraphicsRectItem(square[0], square[1], 50, 50) 
-                square_item.setPen(QPen(Qt.GlobalColor.green))  
-                square_item.setBrush(QBrush(Qt.GlobalColor.green, Qt.BrushStyle.Dense6Pattern)) 
-                self.scene.addItem(square_item)
-
-        for i, ue in enumerate(self.env.user_equipments):
-            ue_size = 25  
-            self.scene.addEllipse(ue.x, ue.y, ue_size, ue_size, 
-                                  QPen(Qt.GlobalColor.red), 
-                                  QBrush(Qt.GlobalColor.red))
-            self.scene.addText(str(i + 1), QFont("Arial", 12)).setPos(ue.x + 10, ue.y - 10)  # UE label
-            if ue.serving_bs:
-                base_station_pos = QPointF(ue.serving_bs.x, ue.serving_bs.y)
-                ue_pos = QPointF(ue.x, ue.y)
-                line = QGraphicsLineItem(base_station_pos.x(), base_station_pos.y(), ue_pos.x(), ue_pos.y())
-                line.setPen(QPen(Qt.GlobalColor.gray, 1))
-                self.scene.addItem(line)
-
-    def update_scene(self):
-        self.populate_scene() 
-
-    def wheelEvent(self, event):
-        factor = 1.2
-        if event.angleDelta().y() < 0:
-            factor = 1 / factor
-        self.scale(factor, factor)
-
-    def mousePressEvent(self, event):
-        if event.button() == Qt.MouseButton.MiddleButton:
-            self.setDragMode(QGraphicsView.DragMode.ScrollHandDrag)
-        super().mousePressEvent(event)
-
-    def mouseReleaseEvent(self, event):
-        if event.button() == Qt.MouseButton.MiddleButton:
-            self.setDragMode(QGraphicsView.DragMode.NoDrag)
-        super().mouseReleaseEvent(event)
-
-    def mouseMoveEvent(self, event):
-        if event.buttons() & Qt.MouseButton.MiddleButton:
-            self.horizontalScrollBar().setValue(self.horizontalScrollBar().value() - event.date().x())
-            self.verticalScrollBar().setValue(self.verticalScrollBar().value() - event.date().y())
-        super().mouseMoveEvent(event)
+from PyQt6.QtWidgets import QGraphicsView, QGraphicsScene, QGraphicsEllipseItem, QGraphicsLineItem, QGraphicsTextItem, QGraphicsItem
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QPen, QBrush, QPainter, QFont, QPainterPath, QImage, QPixmap
+import numpy as np
+from simulation.runner import capture_frame
+
+UE_SIZE = 25
+COVERAGE_RADIUS = 1000
+SQUARE_SIZE = 50
+
+class NetworkView(QGraphicsView):
+    # Retained-mode view: sites, coverage circles and obstacles are built once per
+    # topology, UE markers and serving lines are created once and moved in place.
+    def __init__(self, env):
+        super().__init__()
+        self.env = env
+        self.scene = QGraphicsScene(self)
+        self.setScene(self.scene)
+        self.setRenderHint(QPainter.RenderHint.Antialiasing)
+        self.setViewportUpdateMode(QGraphicsView.ViewportUpdateMode.SmartViewportUpdate)
+        self.setOptimizationFlag(QGraphicsView.OptimizationFlag.DontSavePainterState)
+        self.setDragMode(QGraphicsView.DragMode.RubberBandDrag)
+        self.setSceneRect(-1000, -1000, 6000, 6000)  
+        self.static_items = []
+        self.ue_items = []
+        self.topology = None
+        self.coverage_item = None
+        self.show_coverage = False
+        self.update_scene()
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+
+    def topology_key(self, base_stations):
+        return tuple((bs.x, bs.y, len(bs.squares)) for bs in base_stations)
+
+    def populate_scene(self, base_stations=None):
+        base_stations = self.env.base_stations if base_stations is None else base_stations
+        for item in self.static_items:
+            self.scene.removeItem(item)
+        self.static_items = []
+        self.coverage_item = None
+        self.topology = self.topology_key(base_stations)
+
+        site_pen, site_brush = QPen(Qt.GlobalColor.blue), QBrush(Qt.GlobalColor.blue)
+        coverage_pen = QPen(Qt.GlobalColor.red, 1, Qt.PenStyle.DashLine)
+        square_pen = QPen(Qt.GlobalColor.green)
+        square_brush = QBrush(Qt.GlobalColor.green, Qt.BrushStyle.Dense6Pattern)
+        for i, bs in enumerate(base_stations):
+            label = chr(ord('A') + i)  
+            site = self.scene.addEllipse(bs.x - 5, bs.y - 5, 25, 25, site_pen, site_brush)
+            text = self.scene.addText(label, QFont("Arial", 12))
+            text.setPos(bs.x + 10, bs.y - 10)  
+            coverage_area = self.scene.addEllipse(bs.x - COVERAGE_RADIUS, bs.y - COVERAGE_RADIUS,
+                                                  2 * COVERAGE_RADIUS, 2 * COVERAGE_RADIUS,
+                                                  coverage_pen, QBrush(Qt.GlobalColor.transparent))
+
+            # all of a site's obstacles share one path item instead of one rect item each
+            path = QPainterPath()
+            path.setFillRule(Qt.FillRule.WindingFill)
+            for square in bs.squares: 
+                path.addRect(square[0], square[1], SQUARE_SIZE, SQUARE_SIZE)
+            squares = self.scene.addPath(path, square_pen, square_brush)
+            squares.setCacheMode(QGraphicsItem.CacheMode.DeviceCoordinateCache)
+
+            for item in (site, text, coverage_area, squares):
+                item.setZValue(-1)
+            self.static_items.extend((site, text, coverage_area, squares))
+
+        if self.show_coverage:
+            self.coverage_item = self.coverage_heatmap(self.env.base_stations.coverage_map)
+            self.static_items.append(self.coverage_item)
+
+    def coverage_heatmap(self, coverage_map):
+        # best-server SINR raster drawn as one pixmap, one pixel per grid node
+        sinr = coverage_map.sinr
+        finite = np.isfinite(sinr)
+        low, high = np.percentile(sinr[finite], [2, 98]) if finite.any() else (0, 1)
+        value = np.clip((np.where(finite, sinr, low) - low) / max(high - low, 1e-9), 0, 1)
+        rgba = np.empty(value.shape + (4,), dtype=np.uint8)
+        rgba[..., 0] = 255 * value
+        rgba[..., 1] = 255 * (1 - np.abs(2 * value - 1))
+        rgba[..., 2] = 255 * (1 - value)
+        rgba[..., 3] = 255
+        rgba = np.ascontiguousarray(rgba)
+        height, width = value.shape
+        image = QImage(rgba.data, width, height, 4 * width, QImage.Format.Format_RGBA8888)
+        item = self.scene.addPixmap(QPixmap.fromImage(image))
+        item.setScale(coverage_map.resolution)
+        item.setPos(coverage_map.origin - coverage_map.resolution / 2, coverage_map.origin - coverage_map.resolution / 2)
+        item.setOpacity(0.45)
+        item.setZValue(-2)
+        return item
+
+    def set_coverage_visible(self, visible):
+        self.show_coverage = visible
+        if visible and self.coverage_item is None:
+            self.coverage_item = self.coverage_heatmap(self.env.base_stations.coverage_map)
+            self.static_items.append(self.coverage_item)
+        elif not visible and self.coverage_item is not None:
+            self.scene.removeItem(self.coverage_item)
+            self.static_items.remove(self.coverage_item)
+            self.coverage_item = None
+
+    def sync_ue_items(self, count):
+        while len(self.ue_items) < count:
+            marker = QGraphicsEllipseItem(0, 0, UE_SIZE, UE_SIZE)
+            marker.setPen(QPen(Qt.GlobalColor.red))
+            marker.setBrush(QBrush(Qt.GlobalColor.red))
+            label = QGraphicsTextItem(str(len(self.ue_items) + 1))
+            label.setFont(QFont("Arial", 12))
+            line = QGraphicsLineItem()
+            line.setPen(QPen(Qt.GlobalColor.gray, 1))
+            for item in (marker, label, line):
+                self.scene.addItem(item)
+            self.ue_items.append((marker, label, line))
+        while len(self.ue_items) > count:
+            for item in self.ue_items.pop():
+                self.scene.removeItem(item)
+
+    def update_scene(self, frame=None):
+        # frame: a runner Frame published by the simulation thread; defaults to the live env
+        frame = frame if frame is not None else capture_frame(self.env)
+        if self.topology_key(frame.base_stations) != self.topology:
+            self.populate_scene(frame.base_stations)
+
+        cell_x = [bs.x for bs in frame.base_stations]
+        cell_y = [bs.y for bs in frame.base_stations]
+        self.sync_ue_items(len(frame.ue_x))
+        for (marker, label, line), x, y, s in zip(self.ue_items, frame.ue_x, frame.ue_y, frame.serving):
+            if marker.x() != x or marker.y() != y:
+                marker.setPos(x, y)
+                label.setPos(x + 10, y - 10)  # UE label
+            if s >= 0:
+                line.setLine(cell_x[s], cell_y[s], x, y)
+                line.setVisible(True)
+            else:
+                line.setVisible(False)
+
+    def wheelEvent(self, event):
+        factor = 1.2
+        if event.angleDelta().y() < 0:
+            factor = 1 / factor
+        self.scale(factor, factor)
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.MouseButton.MiddleButton:
+            self.setDragMode(QGraphicsView.DragMode.ScrollHandDrag)
+        super().mousePressEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        if event.button() == Qt.MouseButton.MiddleButton:
+            self.setDragMode(QGraphicsView.DragMode.NoDrag)
+        super().mouseReleaseEvent(event)
+
+    def mouseMoveEvent(self, event):
+        if event.buttons() & Qt.MouseButton.MiddleButton:
+            self.horizontalScrollBar().setValue(self.horizontalScrollBar().value() - event.date().x())
+            self.verticalScrollBar().setValue(self.verticalScrollBar().value() - event.date().y())
+        super().mouseMoveEvent(event)
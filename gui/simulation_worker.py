@@ -0,0 +1,61 @@
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal, pyqtSlot
+from simulation.metrics_writer import close_all
+
+class SimulationWorker(QObject):
+    # Lives in its own QThread and steps the runner there. After every step it
+    # replaces `latest` with a fresh immutable Frame; the GUI reads whichever
+    # frame is current when it repaints, so frames it is too slow for are dropped.
+    finished = pyqtSignal()
+
+    def __init__(self, runner, steps_per_second=10):
+        super().__init__()
+        self.runner = runner
+        self.steps_per_second = steps_per_second
+        self.paused = False
+        self.latest = runner.frame()
+        self.timer = None
+
+    @pyqtSlot()
+    def start(self):
+        # created here so the timer belongs to the worker thread
+        self.timer = QTimer()
+        self.timer.timeout.connect(self.tick)
+        self.schedule()
+
+    def schedule(self):
+        if self.paused or self.runner.done:
+            self.timer.stop()
+        else:
+            # 0 steps/s means unthrottled: run whenever the thread's event queue is idle
+            self.timer.start(int(1000 / self.steps_per_second) if self.steps_per_second else 0)
+
+    @pyqtSlot()
+    def tick(self):
+        if self.runner.done:
+            return
+        self.runner.step()
+        self.latest = self.runner.frame()  # attribute swap; readers never see a partial frame
+        if self.runner.done:
+            self.timer.stop()
+            close_all()
+            self.finished.emit()
+
+    @pyqtSlot(bool)
+    def set_paused(self, paused):
+        self.paused = paused
+        self.schedule()
+
+    @pyqtSlot()
+    def step_once(self):
+        if self.paused:
+            self.tick()
+
+    @pyqtSlot(int)
+    def set_speed(self, steps_per_second):
+        self.steps_per_second = steps_per_second
+        self.schedule()
+
+    @pyqtSlot()
+    def stop(self):
+        if self.timer is not None:
+            self.timer.stop()
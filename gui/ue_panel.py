@@ -0,0 +1,88 @@
+from PyQt6.QtWidgets import QGroupBox, QPushButton, QScrollArea, QVBoxLayout, QWidget
+from PyQt6.QtCore import QTimer
+from gui.plots import SINRPlot, ThroughputPlot
+
+PLOT_HEIGHT = 250
+ROW_HEIGHT = 4 * PLOT_HEIGHT + 90
+
+class UEPlotRow(QGroupBox):
+    def __init__(self, ue_index, trackers, num_base_stations, pinned, on_pin):
+        super().__init__(f"UE {ue_index + 1}")
+        plot_layout = QVBoxLayout()
+        pin_button = QPushButton("Pin")
+        pin_button.setCheckable(True)
+        pin_button.setChecked(pinned)
+        pin_button.toggled.connect(lambda checked: on_pin(ue_index, checked))
+        plot_layout.addWidget(pin_button)
+
+        dynamic_sinr_tracker, dynamic_throughput_tracker, normal_sinr_tracker, normal_throughput_tracker = trackers
+        self.plots = (
+            SINRPlot("Dynamic PRB SINR", num_base_stations, height=PLOT_HEIGHT, tracker=dynamic_sinr_tracker),
+            ThroughputPlot("Dynamic PRB Throughput", num_base_stations, height=PLOT_HEIGHT, tracker=dynamic_throughput_tracker),
+            SINRPlot("Regular PRB SINR", num_base_stations, height=PLOT_HEIGHT, tracker=normal_sinr_tracker),
+            ThroughputPlot("Regular Throughput", num_base_stations, height=PLOT_HEIGHT, tracker=normal_throughput_tracker),
+        )
+        for plot in self.plots:
+            plot_layout.addWidget(plot)
+        self.setLayout(plot_layout)
+
+    def refresh(self):
+        for plot in self.plots:
+            plot.refresh()
+
+class UEPlotPanel(QScrollArea):
+    # Virtualized list of per-UE plot groups: widgets exist only for the rows
+    # currently in the viewport. Pinned UEs are listed first. A new row draws the
+    # tracker's full history on its first refresh, so hidden UEs only cost their
+    # tracker updates.
+    def __init__(self, ue_trackers, num_base_stations=5):
+        super().__init__()
+        self.ue_trackers = ue_trackers
+        self.num_base_stations = num_base_stations
+        self.pinned = []
+        self.rows = {}
+        self.container = QWidget()
+        self.container.setFixedHeight(len(ue_trackers) * ROW_HEIGHT)
+        self.setWidget(self.container)
+        self.setWidgetResizable(True)
+        self.verticalScrollBar().valueChanged.connect(self.update_visible)
+
+    def order(self):
+        pinned = set(self.pinned)
+        return self.pinned + [i for i in range(len(self.ue_trackers)) if i not in pinned]
+
+    def set_pinned(self, ue_index, pinned):
+        if pinned and ue_index not in self.pinned:
+            self.pinned.append(ue_index)
+        elif not pinned and ue_index in self.pinned:
+            self.pinned.remove(ue_index)
+        # defer: this runs from inside the row's own button signal
+        QTimer.singleShot(0, self.update_visible)
+
+    def update_visible(self):
+        top = self.verticalScrollBar().value()
+        first = top // ROW_HEIGHT
+        last = (top + self.viewport().height()) // ROW_HEIGHT
+        visible = self.order()[first:last + 1]
+
+        for ue_index in set(self.rows) - set(visible):
+            self.rows.pop(ue_index).deleteLater()
+        width = self.container.width()
+        for slot, ue_index in enumerate(visible, first):
+            row = self.rows.get(ue_index)
+            if row is None:
+                row = UEPlotRow(ue_index, self.ue_trackers[ue_index], self.num_base_stations,
+                                ue_index in self.pinned, self.set_pinned)
+                row.setParent(self.container)
+                row.refresh()
+                self.rows[ue_index] = row
+            row.setGeometry(0, slot * ROW_HEIGHT, width, ROW_HEIGHT)
+            row.show()
+
+    def refresh(self):
+        for row in self.rows.values():
+            row.refresh()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.update_visible()
@@ -0,0 +1,61 @@
+import argparse
+from simulation import metrics_writer, profiling
+from simulation.environment import Environment
+from simulation.event_engine import EventEngine
+from simulation.mobility import RandomWaypoint
+from simulation.partition import PartitionedSimulation
+from simulation.runner import SimulationRunner
+from simulation.topology import city_layout
+
+
+def run_partitioned(args):
+    env = Environment(mobility=RandomWaypoint(area=(0, args.area)), candidate_radius=2500)
+    base_stations, ue_columns = city_layout(args.cells, args.ues, args.area)
+    for base_station in base_stations:
+        env.add_base_station(base_station)
+    env.user_equipments.add_many(*ue_columns)
+    simulation = PartitionedSimulation(env, tuple(args.tiles))
+    try:
+        simulation.run(args.steps)
+        simulation.print_summary()
+    finally:
+        simulation.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the network simulation without the GUI.")
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--output-format", choices=["csv", "columnar"], default="csv")
+    parser.add_argument("--engine", choices=["tick", "event", "partitioned"], default="tick",
+                        help="event: jump each UE to its next handover/mobility event and integrate metrics in between; "
+                             "partitioned: a large city map split into tiles stepped by worker processes")
+    parser.add_argument("--tiles", type=int, nargs=2, default=[2, 2], metavar=("X", "Y"), help="partitioned: tile grid")
+    parser.add_argument("--ues", type=int, default=100000, help="partitioned: number of UEs")
+    parser.add_argument("--cells", type=int, default=100, help="partitioned: number of base stations")
+    parser.add_argument("--area", type=float, default=30000, help="partitioned: side of the square map in metres")
+    parser.add_argument("--profile", action="store_true", help="collect per-phase timers and counters")
+    parser.add_argument("--profile-steps", type=int, default=0,
+                        help="run the first N steps under cProfile and write the report to --profile-output")
+    parser.add_argument("--profile-output", default="profile.json")
+    args = parser.parse_args()
+
+    metrics_writer.set_output_format(args.output_format)
+    if args.profile:
+        profiling.enable()
+    if args.engine == "partitioned":
+        run_partitioned(args)
+    else:
+        if args.engine == "event":
+            runner = EventEngine(max_time_steps=args.steps)
+        else:
+            runner = SimulationRunner(max_time_steps=args.steps, histories=False)
+        if args.profile_steps and args.engine == "tick":
+            profiling.profile_steps(runner, args.profile_steps, args.profile_output)
+            print(f"Profile of {args.profile_steps} steps written to {args.profile_output}")
+        runner.run()
+        runner.print_summary()
+    if args.profile:
+        for name, stats in profiling.report()["phases"].items():
+            print(f"{name}: {stats['count']} calls, {1000 * stats['mean_s']:.3f} ms mean, {1000 * stats['max_s']:.3f} ms max")
+        for name, value in profiling.report()["counters"].items():
+            print(f"{name}: {value}")
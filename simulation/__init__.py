@@ -0,0 +1,44 @@
+import importlib
+
+# Public names resolve on first access (PEP 562): `import simulation` loads nothing, and
+# gym / stable-baselines3 are only imported by code that asks for the RL wrappers.
+_EXPORTS = {
+    "BaseStation": "simulation.base_station",
+    "BlockageModel": "simulation.blockage",
+    "CellSet": "simulation.population",
+    "CoverageMap": "simulation.coverage",
+    "DynamicPRBPolicy": "simulation.prb_policy",
+    "Environment": "simulation.environment",
+    "EventEngine": "simulation.event_engine",
+    "GaussMarkov": "simulation.mobility",
+    "KPIAggregator": "simulation.kpi",
+    "LinkBudget": "simulation.link_budget",
+    "MobileNetworkEnv": "simulation.network_env",
+    "MobileNetworkRLEnv": "simulation.rl_environment",
+    "MobileNetworkVecEnv": "simulation.vec_env",
+    "PRBComparison": "simulation.prb_policy",
+    "PartitionedSimulation": "simulation.partition",
+    "PRBPolicy": "simulation.prb_policy",
+    "PRBScheduler": "simulation.scheduler",
+    "RandomWaypoint": "simulation.mobility",
+    "RunLog": "simulation.run_log",
+    "SimulationRunner": "simulation.runner",
+    "TargetMobility": "simulation.mobility",
+    "Topology": "simulation.topology",
+    "TopologyPool": "simulation.topology",
+    "UEPopulation": "simulation.population",
+    "UserEquipment": "simulation.user_equipment",
+}
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -1,32 +1,42 @@
-import numpy as np
-
-class BaseStation:
-    def __init__(self, x, y, tx_power=46):
-        self.x = x
-        self.y = y
-        self.tx_power = tx_power
-        self.radius = 1000 
-        self.squares = []
-
-    def signal_strength(self, ue):
-        distance = np.hypot(self.x - ue.x, self.y - ue.y)
-        path_loss = 128.1 + 37.6 * np.log10(max(distance / 1000, 1e-6))
-        return self.tx_power - path_loss
-
-    def get_distance(self, ue):
-        return np.hypot(self.x - ue.x, self.y - ue.y)
-
-    def add_squares(self, num_squares, square_size=50):
-        while len(self.squares) < num_squares:
-            rand_x = np.random.randint(self.x - self.radius, self.x + self.radius - square_size)
-            rand_y = np.random.randint(self.y - self.radius, self.y + self.radius - square_size)
-            if not self.check_overlap(rand_x, rand_y, square_size):
-                self.squares.append((rand_x, rand_y))  
-
-    def check_overlap(self, x, y, size):
-        for square in self.squares:
-            square_x, square_y = square
-            if (x < square_x + size and x + size > square_x and
-                y < square_y + size and y + size > square_y):
-                return True  
-        return False 
+import numpy as np
+from simulation.link_budget import path_loss
+from simulation.spatial_index import SquareGrid
+
+MAX_SQUARE_ATTEMPTS = 10000
+
+class BaseStation:
+    __slots__ = ("x", "y", "tx_power", "radius", "squares", "square_index")
+
+    def __init__(self, x, y, tx_power=46):
+        self.x = x
+        self.y = y
+        self.tx_power = tx_power
+        self.radius = 1000 
+        self.squares = []
+        self.square_index = None
+
+    def signal_strength(self, ue):
+        return self.tx_power - path_loss(self.get_distance(ue))
+
+    def get_distance(self, ue):
+        return np.hypot(self.x - ue.x, self.y - ue.y)
+
+    def add_squares(self, num_squares, square_size=50, max_attempts=MAX_SQUARE_ATTEMPTS):
+        attempts = 0
+        while len(self.squares) < num_squares:
+            if attempts >= max_attempts:
+                raise ValueError(f"could only place {len(self.squares)} of {num_squares} non-overlapping "
+                                 f"{square_size}x{square_size} squares within radius {self.radius} "
+                                 f"after {max_attempts} attempts")
+            attempts += 1
+            rand_x = np.random.randint(self.x - self.radius, self.x + self.radius - square_size)
+            rand_y = np.random.randint(self.y - self.radius, self.y + self.radius - square_size)
+            if not self.check_overlap(rand_x, rand_y, square_size):
+                self.squares.append((rand_x, rand_y))  
+                self.square_index.add(rand_x, rand_y)
+
+    def check_overlap(self, x, y, size):
+        index = self.square_index
+        if index is None or index.size != size or len(index) != len(self.squares):
+            index = self.square_index = SquareGrid(size, squares=self.squares)
+        return index.overlaps(x, y, size)
@@ -0,0 +1,129 @@
+import numpy as np
+from simulation.spatial_index import _expand
+
+PENETRATION_LOSS = 10  # dB per obstacle crossed by the UE -> BS path
+MAX_BLOCKAGE_LOSS = 30
+SECTORS = 720
+CACHED_POPULATIONS = 4
+
+
+class BlockageModel:
+    # Line-of-sight blockage of UE -> cell paths by the obstacle squares.
+    # For every cell the squares are bucketed by the angular sectors they cover
+    # as seen from the site (CSR layout), so a UE only tests
+    # the squares in its own sector with a segment/box slab test. Results are a
+    # pure function of UE position; callers that pass a cache_key (one per UE
+    # population) get them cached, and only UEs whose position changed since that
+    # caller's last call are recomputed.
+    def __init__(self, bs_x, bs_y, squares, size=50, sectors=SECTORS, reach=None,
+                 penetration_loss=PENETRATION_LOSS, max_loss=MAX_BLOCKAGE_LOSS):
+        self.bs_x = np.asarray(bs_x, dtype=float)
+        self.bs_y = np.asarray(bs_y, dtype=float)
+        corners = np.array(squares, dtype=float).reshape(-1, 2)
+        self.square_x = corners[:, 0]
+        self.square_y = corners[:, 1]
+        self.size = float(size)
+        self.sectors = sectors
+        self.penetration_loss = penetration_loss
+        self.max_loss = max_loss
+        self._cache = {}
+        self._build_index(reach)
+
+    @classmethod
+    def from_base_stations(cls, base_stations, **kwargs):
+        return cls([bs.x for bs in base_stations], [bs.y for bs in base_stations],
+                   [square for bs in base_stations for square in bs.squares], **kwargs)
+
+    def __len__(self):
+        return len(self.square_x)
+
+    def _build_index(self, reach):
+        num_cells, num_squares = len(self.bs_x), len(self.square_x)
+        sector_width = 2 * np.pi / self.sectors
+        cell, square = np.divmod(np.arange(num_cells * num_squares), max(num_squares, 1))
+        cell, square = cell[:num_cells * num_squares], square[:num_cells * num_squares]
+
+        corner_x = self.square_x[square, None] + np.array([0, self.size, 0, self.size]) - self.bs_x[cell, None]
+        corner_y = self.square_y[square, None] + np.array([0, 0, self.size, self.size]) - self.bs_y[cell, None]
+        if reach is not None:
+            near = np.hypot(corner_x, corner_y).min(axis=1) <= reach
+            cell, square, corner_x, corner_y = cell[near], square[near], corner_x[near], corner_y[near]
+
+        # angular span of each square around its centre direction (< pi unless the site is inside it)
+        centre = np.arctan2(corner_y.mean(axis=1), corner_x.mean(axis=1))
+        relative = (np.arctan2(corner_y, corner_x) - centre[:, None] + np.pi) % (2 * np.pi) - np.pi
+        first = np.floor((centre + relative.min(axis=1)) / sector_width).astype(np.int64)
+        last = np.floor((centre + relative.max(axis=1)) / sector_width).astype(np.int64)
+        counts = np.minimum(last - first + 1, self.sectors)
+        site_inside = (corner_x[:, 0] <= 0) & (corner_x[:, 3] >= 0) & (corner_y[:, 0] <= 0) & (corner_y[:, 3] >= 0)
+        first[site_inside] = 0
+        counts[site_inside] = self.sectors
+
+        # distance from the site to the nearest point of each square
+        near_x = np.clip(0, corner_x[:, 0], corner_x[:, 3])
+        near_y = np.clip(0, corner_y[:, 0], corner_y[:, 3])
+        near = np.hypot(near_x, near_y)
+
+        entry = np.repeat(np.arange(len(cell)), counts)
+        sector = (_expand(first, counts)) % self.sectors
+        keys = cell[entry] * self.sectors + sector
+        order = np.lexsort((near[entry], keys))
+        self.entry_square = square[entry][order]
+        # one monotone sort value (bucket, then distance) lets searchsorted cut every bucket at once
+        self.distance_scale = 2 * near.max() + 1 if len(near) else 1.0
+        self.entry_value = keys[order] * self.distance_scale + near[entry][order]
+        self.key_start = np.searchsorted(keys[order], np.arange(num_cells * self.sectors + 1))
+
+    def crossings(self, ue_x, ue_y, chunk_pairs=16384):
+        # number of obstacles on each UE -> cell segment, shape (num_ues, num_cells)
+        num_cells = len(self.bs_x)
+        pair_ue, pair_cell = np.divmod(np.arange(len(ue_x) * num_cells), max(num_cells, 1))
+        counts = np.zeros(len(pair_ue), dtype=np.int64)
+        for first in range(0, len(pair_ue), chunk_pairs):
+            rows = slice(first, first + chunk_pairs)
+            counts[rows] = self._count_pairs(ue_x[pair_ue[rows]], ue_y[pair_ue[rows]], pair_cell[rows])
+        return counts.reshape(len(ue_x), num_cells)
+
+    def _count_pairs(self, ue_x, ue_y, cell):
+        origin_x, origin_y = self.bs_x[cell], self.bs_y[cell]
+        dx, dy = ue_x - origin_x, ue_y - origin_y
+        sector = np.floor((np.arctan2(dy, dx) % (2 * np.pi)) / (2 * np.pi / self.sectors)).astype(np.int64) % self.sectors
+        key = cell * self.sectors + sector
+        start = self.key_start[key]
+        # only squares that start closer to the site than the UE can be on the segment
+        stop = np.minimum(np.searchsorted(self.entry_value, key * self.distance_scale + np.hypot(dx, dy)),
+                          self.key_start[key + 1])
+        pair = np.repeat(np.arange(len(key)), stop - start)
+        square = self.entry_square[_expand(start, stop - start)]
+
+        # slab test of origin + t * (dx, dy), t in [0, 1], against [square, square + size];
+        # fmin/fmax drop the NaNs of paths running exactly along a square edge
+        with np.errstate(divide="ignore", invalid="ignore"):
+            inverse_x, inverse_y = 1 / dx, 1 / dy
+            inverse_x, inverse_y = inverse_x[pair], inverse_y[pair]
+            low_x = self.square_x[square] - origin_x[pair]
+            low_y = self.square_y[square] - origin_y[pair]
+            x1, x2 = low_x * inverse_x, (low_x + self.size) * inverse_x
+            y1, y2 = low_y * inverse_y, (low_y + self.size) * inverse_y
+            enter = np.fmax(np.fmax(np.fmin(x1, x2), np.fmin(y1, y2)), 0)
+            leave = np.fmin(np.fmin(np.fmax(x1, x2), np.fmax(y1, y2)), 1)
+        return np.bincount(pair[enter <= leave], minlength=len(key))
+
+    def loss(self, ue_x, ue_y, cache_key=None):
+        ue_x = np.atleast_1d(np.asarray(ue_x, dtype=float))
+        ue_y = np.atleast_1d(np.asarray(ue_y, dtype=float))
+        cached = self._cache.get(cache_key) if cache_key is not None else None
+        if cached is None or len(cached[0]) != len(ue_x):
+            moved = np.arange(len(ue_x))
+            loss = np.zeros((len(ue_x), len(self.bs_x)))
+        else:
+            cached_x, cached_y, loss = cached
+            moved = np.flatnonzero((cached_x != ue_x) | (cached_y != ue_y))
+        if len(moved):
+            loss = loss.copy()
+            loss[moved] = np.minimum(self.crossings(ue_x[moved], ue_y[moved]) * self.penetration_loss, self.max_loss)
+            if cache_key is not None:
+                if cache_key not in self._cache and len(self._cache) >= CACHED_POPULATIONS:
+                    self._cache.pop(next(iter(self._cache)))
+                self._cache[cache_key] = (ue_x.copy(), ue_y.copy(), loss)
+        return loss
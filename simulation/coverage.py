@@ -0,0 +1,69 @@
+import numpy as np
+from simulation.link_budget import noise_power, path_loss
+
+AREA_MIN = 0
+AREA_MAX = 6000
+DEFAULT_RESOLUTION = 50
+REFERENCE_BANDWIDTH = 20
+
+
+class CoverageMap:
+    # Received power of every cell sampled on a regular grid over the simulation
+    # area, and the best-server SINR raster the GUI's coverage overlay draws.
+    # Sites never move within an episode, so the map stays valid until the
+    # topology changes. For display only: LinkBudget always evaluates the exact
+    # path loss.
+    def __init__(self, bs_x, bs_y, tx_power, power, resolution, origin=AREA_MIN):
+        self.bs_x = np.asarray(bs_x, dtype=float)
+        self.bs_y = np.asarray(bs_y, dtype=float)
+        self.tx_power = np.asarray(tx_power, dtype=float)
+        self.power = power  # (num_bs, ny, nx) dBm at the grid nodes
+        self.resolution = resolution
+        self.origin = origin
+        self._sinr = None
+
+    @classmethod
+    def build(cls, bs_x, bs_y, tx_power, resolution=DEFAULT_RESOLUTION, area_min=AREA_MIN, area_max=AREA_MAX):
+        bs_x, bs_y, tx_power = (np.asarray(column, dtype=float) for column in (bs_x, bs_y, tx_power))
+        nodes = np.arange(area_min, area_max + resolution, resolution, dtype=float)
+        power = np.empty((len(bs_x), len(nodes), len(nodes)), dtype=np.float32)
+        for i in range(len(bs_x)):
+            distance = np.hypot(nodes[None, :] - bs_x[i], nodes[:, None] - bs_y[i])
+            power[i] = tx_power[i] - path_loss(distance)
+        return cls(bs_x, bs_y, tx_power, power, resolution, area_min)
+
+    @property
+    def shape(self):
+        return self.power.shape[1:]
+
+    @property
+    def sinr(self):
+        # best-server SINR at every node, using LinkBudget's interference model
+        # (dB average over the other cells) and the noise of a 20 MHz UE
+        if self._sinr is None:
+            num_bs = len(self.power)
+            with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+                best = self.power.max(axis=0) if num_bs else np.full(self.shape, -np.inf, dtype=np.float32)
+                interference = (self.power.sum(axis=0) - best) / (num_bs - 1)
+                P_interference = 10 ** (interference / 10) if num_bs > 1 else 0.0
+                P_noise = 10 ** (noise_power(REFERENCE_BANDWIDTH) / 10)
+                self._sinr = (10 * np.log10(10 ** (best / 10) / (P_interference + P_noise))).astype(np.float32)
+        return self._sinr
+
+    def arrays(self, prefix=""):
+        return {f"{prefix}bs_x": self.bs_x, f"{prefix}bs_y": self.bs_y, f"{prefix}tx_power": self.tx_power,
+                f"{prefix}power": self.power, f"{prefix}resolution": np.array(self.resolution),
+                f"{prefix}origin": np.array(self.origin)}
+
+    @classmethod
+    def from_arrays(cls, arrays, prefix=""):
+        return cls(arrays[f"{prefix}bs_x"], arrays[f"{prefix}bs_y"], arrays[f"{prefix}tx_power"],
+                   arrays[f"{prefix}power"], arrays[f"{prefix}resolution"].item(), arrays[f"{prefix}origin"].item())
+
+    def save(self, path):
+        np.savez(path, **self.arrays())
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as arrays:
+            return cls.from_arrays(arrays)
@@ -1,16 +1,24 @@
-class Environment:
-    def __init__(self, grid_size=200):
-        self.grid_size = grid_size
-        self.base_stations = []
-        self.user_equipments = []
-
-    def add_base_station(self, base_station):
-        self.base_stations.append(base_station)
-
-    def add_user_equipment(self, ue):
-        self.user_equipments.append(ue)
-
-    def update(self):
-        for ue in self.user_equipments:
-            ue.move()
-            ue.update_signal_strength(self.base_stations)
+from simulation import profiling
+from simulation.population import CellSet, UEPopulation
+
+class Environment:
+    def __init__(self, grid_size=200, mobility=None, candidate_radius=None, blockage=False):
+        self.grid_size = grid_size
+        self.base_stations = CellSet(candidate_radius=candidate_radius, blockage=blockage)
+        self.user_equipments = UEPopulation(self.base_stations, mobility=mobility)
+
+    def add_base_station(self, base_station):
+        self.base_stations.append(base_station)
+
+    def add_user_equipment(self, ue):
+        return self.user_equipments.append(ue)
+
+    @property
+    def link_budget(self):
+        return self.base_stations.link_budget
+
+    def update(self):
+        with profiling.phase("mobility"):
+            self.user_equipments.move()
+        with profiling.phase("link_budget"):
+            self.link_budget.update(self.user_equipments)
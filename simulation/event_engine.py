@@ -0,0 +1,221 @@
+import heapq
+import numpy as np
+from simulation import profiling
+from simulation.kpi import KPIAggregator
+from simulation.metrics import HANDOVER_WINDOW
+from simulation.network_env import MobileNetworkEnv
+from simulation.prb_policy import POWER_PER_DATA_UNIT, SIGNAL_BANDS, DynamicPRBPolicy, PRBPolicy
+from simulation.runner import MetricsSummary
+
+# |d path_loss / d distance| = PATH_LOSS_SLOPE / distance (dB per metre)
+PATH_LOSS_SLOPE = 37.6 / np.log(10)
+# entering or leaving cell radii moves the SINR ranking by at most this much (mean in-radius loss, twice)
+RING_JUMP = 6.0
+
+METRIC_KEYS = ("latency", "packet_loss", "throughput", "energy")
+
+
+class EventEngine(MetricsSummary):
+    # Event-driven counterpart of SimulationRunner. Each UE sleeps until its next interesting
+    # tick (the serving cell or packet-loss band may change, its mobility model leaves the
+    # straight line to the target, its handover interruption window ends) and is then moved
+    # there in one jump. Per-tick metrics in between are integrated along the straight segment.
+    def __init__(self, env=None, max_time_steps=200, max_interval=None, prb_policies=()):
+        self.env = env if env is not None else MobileNetworkEnv()
+        self.max_time_steps = max_time_steps
+        # max_interval=1 turns every tick into an event, i.e. the fixed-tick loop
+        self.max_interval = max_interval
+        self.time_step = 0
+        # the last policy is the baseline whose cell selection the UEs follow
+        self.prb_policies = tuple(prb_policies) + (DynamicPRBPolicy(), PRBPolicy())
+        self.metrics = {policy.name: {key: 0 for key in METRIC_KEYS} for policy in self.prb_policies}
+        self.dynamic_metrics = self.metrics["dynamic"]
+        self.regular_metrics = self.metrics["regular"]
+        # throughput summed over ticks outside handover interruption windows
+        self.delivered_throughput = {policy.name: 0.0 for policy in self.prb_policies}
+        self.events = 0
+        self.handovers = 0
+
+        count = len(self.env.user_equipments)
+        self.clock = np.zeros(count, dtype=np.int64)
+        self.interrupt_from = np.full(count, -1, dtype=np.int64)
+        self.interrupt_to = np.full(count, -1, dtype=np.int64)
+        # per-tick metric values at each UE's clock: one METRIC_KEYS block per policy
+        self.samples = np.zeros((count, len(self.prb_policies) * len(METRIC_KEYS)))
+        self.handover_events = [[] for _ in range(count)]
+        # end-of-interval values, weighted by the ticks they stand for
+        self.kpis = KPIAggregator(count, len(self.env.base_stations), tuple(self.metrics))
+        self._calendar = {}
+        self._times = []
+        self._start()
+
+    @property
+    def done(self):
+        return self.time_step >= self.max_time_steps
+
+    def _start(self):
+        ues = self.env.user_equipments
+        indices = np.arange(len(ues))
+        if not len(indices):
+            return
+        values, regular = self._sample(indices, ues.x[indices], ues.y[indices])
+        attached = regular.best_index >= 0
+        ues.serving[indices[attached]] = regular.best_index[attached]
+        self.samples[indices] = values
+        self._schedule(0, indices, regular)
+
+    def _schedule(self, time_step, indices, state):
+        if time_step >= self.max_time_steps:
+            return
+        ues = self.env.user_equipments
+        interval = np.minimum(ues.mobility.linear_moves(ues, indices), self._horizon(indices, state))
+        in_window = self.interrupt_to[indices] > time_step
+        interval = np.where(in_window, np.minimum(interval, self.interrupt_to[indices] - time_step), interval)
+        if self.max_interval is not None:
+            interval = np.minimum(interval, self.max_interval)
+        next_event = np.minimum(time_step + np.maximum(interval, 1), self.max_time_steps)
+        for time in np.unique(next_event):
+            time = int(time)
+            if time not in self._calendar:
+                self._calendar[time] = []
+                heapq.heappush(self._times, time)
+            self._calendar[time].append(indices[next_event == time])
+
+    def _horizon(self, indices, state):
+        # Ticks the UE can move (at most step_size per tick) before the best cell or the packet
+        # loss band could change. Along a move of D <= nearest / 2 every cell stays at least half
+        # its distance away, so a SINR difference changes by at most 8 * PATH_LOSS_SLOPE / nearest per metre.
+        budget = self.env.link_budget
+        ues = self.env.user_equipments
+        if budget.blockage is not None or len(budget) == 0:
+            return np.ones(len(indices), dtype=np.int64)
+        x, y = ues.x[indices], ues.y[indices]
+        distance = budget.distances(x, y)
+        nearest = np.maximum(distance.min(axis=1), 1.0)
+        rows = np.arange(len(indices))
+        best = state.best_index
+
+        candidate_sinr = np.where(state.p_failure > 0.5, state.sinr, -np.inf)
+        candidates = budget.candidates(x, y, distance)
+        if candidates is not None:
+            candidate_sinr[~candidates] = -np.inf
+        candidate_sinr[np.isnan(candidate_sinr)] = -np.inf
+        if candidate_sinr.shape[1] > 1:
+            ranked = np.partition(candidate_sinr, -2, axis=1)
+            with np.errstate(invalid="ignore"):
+                margin = ranked[:, -1] - ranked[:, -2]
+        else:
+            margin = np.full(len(indices), np.inf)
+        signal = state.signal[rows, np.maximum(best, 0)]
+        for band in SIGNAL_BANDS:
+            margin = np.minimum(margin, np.abs(signal - band))
+        margin = np.where((best >= 0) & ~np.isnan(margin), margin, 0.0)
+
+        gradient = 8 * PATH_LOSS_SLOPE / nearest
+        reach = np.minimum(nearest / 2, margin / gradient)
+        ring = np.abs(distance - budget.radius[None, :]).min(axis=1)
+        reduced = np.minimum(nearest / 2, np.maximum(margin - RING_JUMP, 0) / gradient)
+        reach = np.where(ring < reach, np.maximum(ring, reduced), reach)
+        if budget.candidate_radius is not None:
+            reach = np.minimum(reach, np.abs(distance - budget.candidate_radius).min(axis=1))
+        return np.maximum(np.floor(reach / ues.mobility.step_size), 1).astype(np.int64)
+
+    def _sample(self, indices, x, y):
+        ues = self.env.user_equipments
+        budget = self.env.link_budget
+        count = len(x)
+        noise = np.resize(ues.noise[indices], count)
+        bandwidth = np.resize(ues.bandwidth[indices], count)
+        serving = np.resize(ues.serving[indices], count)
+        values = np.empty((count, len(self.prb_policies) * len(METRIC_KEYS)))
+        radio = budget.radio(x, y, noise, expected_loss=True)
+        for offset, policy in enumerate(self.prb_policies):
+            state = budget.link_state(radio, bandwidth, policy.extra_bandwidth)
+            column = offset * len(METRIC_KEYS)
+            values[:, column:column + len(METRIC_KEYS)] = self._metrics(policy, state, radio, serving, bandwidth)
+        return values, state
+
+    def _metrics(self, policy, state, radio, serving, bandwidth):
+        # expected per-tick values of the quantities SimulationRunner.calculate_metrics sums
+        serving = np.where(state.best_index >= 0, state.best_index, serving)
+        attached = serving >= 0
+        latency, packet_loss, _, _ = policy.metrics(state, radio, serving, bandwidth, expected=True)
+        throughput = np.where(state.best_index >= 0, state.best_throughput, 0.0)
+        values = np.column_stack([latency, packet_loss, throughput, POWER_PER_DATA_UNIT * throughput])
+        return np.where(attached[:, None], values, 0.0)
+
+    def _process(self, time_step, indices):
+        ues = self.env.user_equipments
+        mobility = ues.mobility
+        ticks = time_step - self.clock[indices]
+        start_x, start_y = ues.x[indices], ues.y[indices]
+        with profiling.phase("event.mobility"):
+            mobility.skip(ues, indices, ticks - 1)
+            mobility.advance(ues, indices)
+        end_x, end_y = ues.x[indices], ues.y[indices]
+
+        with profiling.phase("event.sample"):
+            # midpoint and end of the straight segment covered since the UE's last event
+            values, state = self._sample(indices, np.concatenate([(start_x + end_x) / 2, end_x]),
+                                         np.concatenate([(start_y + end_y) / 2, end_y]))
+        count = len(indices)
+        middle, end = values[:count], values[count:]
+        state = state._replace(**{field: value[count:] for field, value in state._asdict().items()})
+
+        # sum over the ticks clock+1 .. time_step: Simpson's rule over the segment plus the
+        # Euler-Maclaurin end correction, exact for metrics that are linear along the path
+        start = self.samples[indices]
+        k = ticks[:, None].astype(float)
+        totals = np.where(k == 1, end, k / 6 * (start + 4 * middle + end) + (end - start) / 2)
+
+        serving = ues.serving[indices]
+        best = state.best_index
+        changed = (best >= 0) & (best != serving)
+        handover = changed & (serving >= 0)
+        in_window = (self.clock[indices] >= self.interrupt_from[indices]) & (time_step <= self.interrupt_to[indices])
+        for offset, policy in enumerate(self.prb_policies):
+            name, metrics = policy.name, self.metrics[policy.name]
+            column = offset * len(METRIC_KEYS)
+            for i, key in enumerate(METRIC_KEYS):
+                metrics[key] += totals[:, column + i].sum()
+            throughput = totals[:, column + 2]
+            delivered = np.where(in_window, 0.0, throughput) - np.where(handover, end[:, column + 2], 0.0)
+            self.delivered_throughput[name] += delivered.sum()
+
+        ues.serving[indices[changed]] = best[changed]
+        self._update_kpis(indices, ues.serving[indices], end, handover, ticks)
+        attached = ues.serving[indices] >= 0
+        ues.signal_strength[indices[attached]] = state.signal[np.flatnonzero(attached), ues.serving[indices[attached]]]
+        ues.throughput[indices] = state.best_throughput
+        for index in indices[handover]:
+            # same (predicted, actual, latency) triple as the trackers, in SimulationRunner time steps
+            actual = time_step - 1
+            self.handover_events[index].append((actual - HANDOVER_WINDOW, actual, actual + HANDOVER_WINDOW))
+        self.interrupt_from[indices[handover]] = time_step
+        self.interrupt_to[indices[handover]] = time_step + HANDOVER_WINDOW
+        self.handovers += int(np.count_nonzero(handover))
+
+        self.samples[indices] = end
+        self.clock[indices] = time_step
+        self.events += count
+        profiling.count("events", count)
+        self._schedule(time_step, indices, state)
+
+    def _update_kpis(self, indices, serving, values, handover, ticks):
+        for offset, policy in enumerate(self.prb_policies):
+            method = policy.name
+            column = offset * len(METRIC_KEYS)
+            columns = {key: values[:, column + i] for i, key in enumerate(METRIC_KEYS)}
+            # weighted by ticks, the handover column averages to handovers per tick
+            self.kpis.update(method, serving, columns, handover / ticks, weights=ticks, ues=indices)
+
+    def run_until(self, time_step):
+        time_step = min(time_step, self.max_time_steps)
+        while self._times and self._times[0] <= time_step:
+            time = heapq.heappop(self._times)
+            self._process(time, np.concatenate(self._calendar.pop(time)))
+        self.time_step = max(self.time_step, time_step)
+
+    def run(self):
+        self.run_until(self.max_time_steps)
+        return self.summary()
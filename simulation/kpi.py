@@ -0,0 +1,155 @@
+import numpy as np
+
+METRICS = ("latency", "packet_loss", "throughput", "energy")
+QUANTILES = (0.5, 0.95, 0.99)
+RELATIVE_ACCURACY = 0.02
+# values the sketches resolve; anything at or below the low end lands in the zero bucket,
+# anything above the high end in the top bucket
+RANGES = {
+    "latency": (10.0, 1e4),
+    "packet_loss": (0.1, 100.0),
+    "throughput": (0.01, 1e4),
+    "energy": (1e-4, 100.0),
+}
+
+
+class OnlineStats:
+    # Count, mean, variance (M2), min and max for many groups, merged one batch at a time
+    # with the parallel Welford update, so memory does not grow with the number of samples.
+    def __init__(self, groups):
+        self.groups = groups
+        self.count = np.zeros(groups)
+        self.mean = np.zeros(groups)
+        self.m2 = np.zeros(groups)
+        self.min = np.full(groups, np.inf)
+        self.max = np.full(groups, -np.inf)
+
+    def update(self, group, values, weights=None):
+        weights = np.ones(len(values)) if weights is None else np.asarray(weights, dtype=float)
+        n = np.bincount(group, weights, minlength=self.groups)
+        seen = n > 0
+        safe_n = np.where(seen, n, 1)
+        batch_mean = np.bincount(group, weights * values, minlength=self.groups) / safe_n
+        batch_m2 = np.bincount(group, weights * (values - batch_mean[group]) ** 2, minlength=self.groups)
+        count = self.count + n
+        safe_count = np.where(count > 0, count, 1)
+        delta = batch_mean - self.mean
+        self.mean = np.where(seen, self.mean + delta * n / safe_count, self.mean)
+        self.m2 = np.where(seen, self.m2 + batch_m2 + delta ** 2 * self.count * n / safe_count, self.m2)
+        self.count = count
+        np.minimum.at(self.min, group, values)
+        np.maximum.at(self.max, group, values)
+
+    @property
+    def variance(self):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.count > 0, self.m2 / self.count, np.nan)
+
+
+class QuantileSketch:
+    # Log-binned histogram per group: bucket i >= 1 holds (low * gamma^(i-1), low * gamma^i],
+    # so any reported quantile is within `accuracy` (relative) of a true sample in range.
+    def __init__(self, groups, low, high, accuracy=RELATIVE_ACCURACY):
+        self.groups = groups
+        self.low = low
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self.bins = int(np.ceil(np.log(high / low) / np.log(self.gamma))) + 1
+        self.counts = np.zeros((groups, self.bins), dtype=np.uint32)
+
+    def bucket(self, values):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            index = np.ceil(np.log(np.maximum(values, 0) / self.low) / np.log(self.gamma))
+        return np.clip(np.nan_to_num(index, nan=0, neginf=0), 0, self.bins - 1).astype(np.int64)
+
+    def update(self, group, values, weights=None, unique=False):
+        weights = 1 if weights is None else np.asarray(weights, dtype=np.uint32)
+        flat = group * self.bins + self.bucket(values)
+        if unique:
+            # at most one sample per group (the per-UE scope): plain fancy indexing is enough
+            self.counts.reshape(-1)[flat] += weights
+        else:
+            np.add.at(self.counts.reshape(-1), flat, weights)
+
+    def quantiles(self, quantiles=QUANTILES, groups=slice(None)):
+        cumulative = np.cumsum(self.counts[groups], axis=1, dtype=np.int64)
+        total = cumulative[:, -1]
+        rank = np.asarray(quantiles)[None, :] * (total[:, None] - 1)
+        index = (cumulative[:, None, :] > rank[:, :, None]).argmax(axis=2)
+        value = np.where(index == 0, 0.0, self.low * 2 * self.gamma ** index / (self.gamma + 1))
+        return np.where(total[:, None] > 0, value, np.nan)
+
+
+class KPIAggregator:
+    # Streaming per-UE, per-cell and global KPIs for each PRB method. Groups are laid out as
+    # [global, cells..., UEs...] so every scope is updated by the same bincount.
+    def __init__(self, num_ues, num_cells, methods=("dynamic", "regular"), accuracy=RELATIVE_ACCURACY):
+        self.num_ues = num_ues
+        self.num_cells = num_cells
+        self.methods = methods
+        groups = 1 + num_cells + num_ues
+        self.offsets = {"global": slice(0, 1), "cell": slice(1, 1 + num_cells), "ue": slice(1 + num_cells, groups)}
+        self.stats = {(method, metric): OnlineStats(groups) for method in methods for metric in METRICS + ("handovers",)}
+        self.shared_sketches = {(method, metric): QuantileSketch(1 + num_cells, *RANGES[metric], accuracy)
+                                for method in methods for metric in METRICS}
+        self.ue_sketches = {(method, metric): QuantileSketch(num_ues, *RANGES[metric], accuracy)
+                            for method in methods for metric in METRICS}
+
+    def update(self, method, serving, values, handovers, weights=None, ues=None):
+        # values: metric -> one value per UE row; weights: ticks each value stands for;
+        # ues: the UE index of each row when only some UEs are reported
+        serving = np.asarray(serving)
+        every = np.arange(len(serving))
+        ues = every if ues is None else np.asarray(ues)
+        attached = every[serving >= 0]
+        shared = np.concatenate([np.zeros(len(every), dtype=np.int64), 1 + serving[attached]])
+        groups = np.concatenate([shared, 1 + self.num_cells + ues])
+        rows = np.concatenate([every, attached, every])
+        split = len(shared)
+        for metric in METRICS + ("handovers",):
+            samples = np.asarray(handovers if metric == "handovers" else values[metric], dtype=float)[rows]
+            finite = np.isfinite(samples)
+            sample_weights = None if weights is None else np.asarray(weights)[rows]
+            self.stats[(method, metric)].update(groups[finite], samples[finite],
+                                                None if weights is None else sample_weights[finite])
+            if metric == "handovers":
+                continue
+            for sketch, group, part, unique in ((self.shared_sketches[(method, metric)], shared, slice(0, split), False),
+                                                (self.ue_sketches[(method, metric)], ues, slice(split, None), True)):
+                keep = finite[part]
+                sketch.update(group[keep], samples[part][keep],
+                              None if weights is None else sample_weights[part][keep], unique=unique)
+
+    def _quantiles(self, method, metric, scope):
+        if scope == "ue":
+            return self.ue_sketches[(method, metric)].quantiles()
+        return self.shared_sketches[(method, metric)].quantiles(groups=self.offsets[scope])
+
+    def report(self, method="dynamic", scope="global"):
+        # metric -> {count, mean, std, min, max, p50, p95, p99}, one entry per group of the scope;
+        # "handovers" reports the handover rate per tick (its mean) and, globally, rate quantiles over UEs
+        groups = self.offsets[scope]
+        report = {}
+        for metric in METRICS + ("handovers",):
+            stats = self.stats[(method, metric)]
+            entry = {"count": stats.count[groups], "mean": stats.mean[groups], "std": np.sqrt(stats.variance[groups]),
+                     "min": stats.min[groups], "max": stats.max[groups]}
+            if metric == "handovers":
+                rates = stats.mean[self.offsets["ue"]][stats.count[self.offsets["ue"]] > 0]
+                quantiles = np.full((len(entry["count"]), len(QUANTILES)), np.nan)
+                if scope == "global" and len(rates):
+                    quantiles[:] = np.quantile(rates, QUANTILES)
+            else:
+                quantiles = self._quantiles(method, metric, scope)
+            for i, q in enumerate(QUANTILES):
+                entry[f"p{round(q * 100)}"] = quantiles[:, i]
+            if scope == "global":
+                entry = {key: float(value[0]) for key, value in entry.items()}
+            report[metric] = entry
+        return report
+
+    def format(self, method="dynamic"):
+        lines = []
+        for metric, entry in self.report(method).items():
+            lines.append(f"{metric}: mean {entry['mean']:.3f} std {entry['std']:.3f} "
+                         f"p50 {entry['p50']:.3f} p95 {entry['p95']:.3f} p99 {entry['p99']:.3f}")
+        return lines
@@ -0,0 +1,183 @@
+import numpy as np
+from collections import namedtuple
+from simulation import profiling
+
+MIN_REQUIRED_THROUGHPUT = 10
+LAMBDA_VALUE = 0.01
+DYNAMIC_PRB_BANDWIDTH = 10
+LOSS_CHOICES = np.array([-2, -3, -4])
+
+LinkState = namedtuple("LinkState", ["signal", "sinr", "throughput", "p_failure",
+                                     "best_index", "best_sinr", "best_throughput"])
+RadioState = namedtuple("RadioState", ["distance", "signal", "sinr", "candidates"])
+
+
+def path_loss(distance):
+    return 128.1 + 37.6 * np.log10(np.maximum(distance / 1000, 1e-6))
+
+
+def noise_power(bandwidth):
+    return -174 + 10 * np.log10(bandwidth * 1e6) + 9
+
+
+class LinkBudget:
+    def __init__(self, base_stations, rng=None, candidate_radius=None, blockage=None):
+        self.base_stations = list(base_stations)
+        self.bs_x = np.array([bs.x for bs in self.base_stations], dtype=float)
+        self.bs_y = np.array([bs.y for bs in self.base_stations], dtype=float)
+        self.tx_power = np.array([bs.tx_power for bs in self.base_stations], dtype=float)
+        self.radius = np.array([bs.radius for bs in self.base_stations], dtype=float)
+        self.index = {id(bs): i for i, bs in enumerate(self.base_stations)}
+        self.rng = np.random if rng is None else rng
+        self.candidate_radius = candidate_radius
+        # optional BlockageModel: obstacle squares on the UE -> cell path attenuate the signal
+        self.blockage = blockage
+
+    @classmethod
+    def stack(cls, budgets, counts):
+        # one budget over the UEs of several independent networks with equally many cells: the
+        # cell columns become (UEs, cells) rows, so each UE only sees its own network's cells
+        first = budgets[0]
+        stacked = cls((), rng=first.rng, candidate_radius=first.candidate_radius)
+        for name in ("bs_x", "bs_y", "tx_power", "radius"):
+            setattr(stacked, name, np.repeat([getattr(budget, name) for budget in budgets], counts, axis=0))
+        return stacked
+
+    def __len__(self):
+        return len(self.base_stations)
+
+    def index_of(self, bs):
+        return -1 if bs is None else self.index[id(bs)]
+
+    def candidates(self, ue_x, ue_y, distance=None):
+        # cells a UE may attach to; SINR needs every cell's signal for the interference term
+        # anyway, so the mask comes straight from the dense distances
+        if self.candidate_radius is None:
+            return None
+        if distance is None:
+            distance = self.distances(np.asarray(ue_x, dtype=float), np.asarray(ue_y, dtype=float))
+        return distance <= self.candidate_radius
+
+    def strongest(self, ue_x, ue_y):
+        ue_x = np.atleast_1d(np.asarray(ue_x, dtype=float))
+        ue_y = np.atleast_1d(np.asarray(ue_y, dtype=float))
+        if not self.bs_x.shape[-1]:
+            return np.full(len(ue_x), -1)
+        signal = self.received_power(ue_x, ue_y)
+        candidates = self.candidates(ue_x, ue_y)
+        if candidates is not None:
+            signal = np.where(candidates, signal, -np.inf)
+        best = np.argmax(signal, axis=1)
+        return np.where(signal[np.arange(len(ue_x)), best] > -np.inf, best, -1)
+
+    def distances(self, ue_x, ue_y):
+        return np.hypot(self.bs_x - ue_x[:, None], self.bs_y - ue_y[:, None])
+
+    def received_power(self, ue_x, ue_y, distance=None, cache_key=None):
+        if distance is None:
+            distance = self.distances(ue_x, ue_y)
+        power = self.tx_power - path_loss(distance)
+        if self.blockage is not None:
+            with profiling.phase("link_budget.blockage"):
+                power = power - self.blockage.loss(ue_x, ue_y, cache_key)
+        return power
+
+    def radio(self, ue_x, ue_y, noise, expected_loss=False, cache_key=None):
+        # the policy-independent part of a link evaluation: geometry, received power and SINR;
+        # cache_key identifies the UE population so blockage is only recomputed for UEs that moved
+        ue_x = np.asarray(ue_x, dtype=float)
+        ue_y = np.asarray(ue_y, dtype=float)
+        noise = np.asarray(noise, dtype=float)[:, None]
+        num_bs = self.bs_x.shape[-1]
+        profiling.count("signal_evaluations", len(ue_x) * num_bs)
+
+        distance = self.distances(ue_x, ue_y)
+        signal = self.received_power(ue_x, ue_y, distance, cache_key)
+
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            # average (in dB) of every other station, as in the scalar loop
+            interference = (signal.sum(axis=1, keepdims=True) - signal) / (num_bs - 1)
+            P_signal = 10 ** (signal / 10)
+            P_interference = 10 ** (interference / 10)
+            P_noise = 10 ** (noise / 10)
+            sinr = 10 * np.log10(P_signal / (P_interference + P_noise))
+
+            inside = distance <= self.radius
+            count = int(np.count_nonzero(inside))
+            if count:
+                # expected_loss applies the mean in-radius loss instead of a random draw
+                sinr[inside] += LOSS_CHOICES.mean() if expected_loss else self.rng.choice(LOSS_CHOICES, size=count)
+
+        return RadioState(distance, signal, sinr, self.candidates(ue_x, ue_y, distance))
+
+    def link_state(self, radio, bandwidth, extra_bandwidth=0):
+        # throughput, failure probability and best cell for one PRB policy on top of a shared RadioState
+        bandwidth = np.asarray(bandwidth, dtype=float)[:, None]
+        extra_bandwidth = np.broadcast_to(np.asarray(extra_bandwidth, dtype=float), bandwidth.shape[:1])[:, None]
+        sinr = radio.sinr
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            adjusted_bandwidth = bandwidth + extra_bandwidth
+            throughput = adjusted_bandwidth * np.log2(1 + 10 ** (sinr / 10))
+
+            gamma_th = 2 ** (MIN_REQUIRED_THROUGHPUT / bandwidth) - 1
+            gamma = 2 ** (throughput / bandwidth) - 1
+            p_failure = 1 - np.exp(-gamma_th / LAMBDA_VALUE * gamma)
+
+        candidate_sinr = np.where(p_failure > 0.5, sinr, -np.inf)
+        if radio.candidates is not None:
+            candidate_sinr[~radio.candidates] = -np.inf
+        candidate_sinr[np.isnan(candidate_sinr)] = -np.inf
+        rows = np.arange(len(sinr))
+        if sinr.shape[1]:
+            best_index = np.argmax(candidate_sinr, axis=1)
+            best_sinr = candidate_sinr[rows, best_index]
+            found = best_sinr > -np.inf
+            best_throughput = np.where(found, throughput[rows, best_index], -np.inf)
+            best_index = np.where(found, best_index, -1)
+        else:
+            best_index = np.full(len(sinr), -1)
+            best_sinr = np.full(len(sinr), -np.inf)
+            best_throughput = np.full(len(sinr), -np.inf)
+
+        return LinkState(radio.signal, sinr, throughput, p_failure, best_index, best_sinr, best_throughput)
+
+    def evaluate(self, ue_x, ue_y, noise, bandwidth, dynamic_prb, expected_loss=False, cache_key=None):
+        radio = self.radio(ue_x, ue_y, noise, expected_loss, cache_key)
+        extra_bandwidth = np.where(np.asarray(dynamic_prb, dtype=bool), DYNAMIC_PRB_BANDWIDTH, 0)
+        return self.link_state(radio, bandwidth, extra_bandwidth)
+
+    def update(self, user_equipments):
+        apply_link_state = getattr(user_equipments, "apply_link_state", None)
+        if apply_link_state is not None:
+            with profiling.phase("link_budget.evaluate"):
+                state = self.evaluate(user_equipments.x, user_equipments.y, user_equipments.noise,
+                                      user_equipments.bandwidth, user_equipments.dynamic_prb,
+                                      cache_key=id(user_equipments))
+            apply_link_state(state)
+            return state
+
+        user_equipments = list(user_equipments)
+        if not user_equipments:
+            return None
+        state = self.evaluate([ue.x for ue in user_equipments],
+                              [ue.y for ue in user_equipments],
+                              [ue.noise for ue in user_equipments],
+                              [ue.bandwidth for ue in user_equipments],
+                              [ue.dynamic_prb for ue in user_equipments])
+
+        for row, ue in enumerate(user_equipments):
+            best = state.best_index[row]
+            if best >= 0:
+                best_bs = self.base_stations[best]
+                if best_bs != ue.serving_bs:
+                    if ue.serving_bs is not None:
+                        ue.handover_occurred = True
+                    ue.serving_bs = best_bs
+
+            serving = self.index.get(id(ue.serving_bs), -1) if ue.serving_bs is not None else -1
+            if serving >= 0:
+                ue.signal_strength = state.signal[row, serving]
+            elif ue.serving_bs is not None:
+                ue.signal_strength = ue.serving_bs.signal_strength(ue)
+            ue.throughput = state.best_throughput[row]
+        return state
@@ -0,0 +1,127 @@
+import numpy as np
+from simulation.metrics_writer import get_writer, LOG_HEADER, PRB_HEADER
+from simulation.ring_buffer import RingBuffer
+from simulation.scheduler import BANDWIDTH_PER_PRB, BASE_PRBS
+
+HANDOVER_WINDOW = 30
+HISTORY_LENGTH = 30000
+
+
+class SINRTracker:
+    def __init__(self, history_length=HISTORY_LENGTH):
+        # the plotted per-step history; 0 keeps none (headless runs only need the scalars)
+        self.sinr_data = RingBuffer(history_length)
+        self.handover_events = []
+        self.cur_min_time_step = None
+        self.cur_min_value = float('inf')
+
+    def update(self, ue, base_stations, time_step):
+        interference = np.average([b.signal_strength(ue) for b in base_stations if b != ue.serving_bs])
+        P_signal = 10 ** (ue.serving_bs.signal_strength(ue) / 10)
+        P_interference = 10 ** (interference / 10)
+        P_noise = 10 ** (ue.noise / 10)
+        SINR_linear = P_signal / (P_interference + P_noise)
+        sinr = 10 * np.log10(SINR_linear)
+        self.record(time_step, sinr, ue.handover_occurred)
+
+    def record(self, time_step, sinr, handover):
+        self.sinr_data.append(sinr)
+        if sinr < self.cur_min_value:
+            self.cur_min_value = sinr
+            self.cur_min_time_step = time_step
+        if handover:
+            self.handover_events.append((time_step - HANDOVER_WINDOW, time_step, time_step + HANDOVER_WINDOW))
+
+
+class ThroughputTracker:
+    def __init__(self, history_length=HISTORY_LENGTH):
+        self.throughput_data = RingBuffer(history_length)
+        self.handover_events = []
+        self.cur_min_time_step = None
+        self.cur_min_value = float('inf')
+        self.cur_max_value = 0
+        self.actual = 0
+        self.latency = 0
+
+    def update(self, ue, base_stations, time_step, index, extra_prbs=0.0):
+        signal_strength = ue.serving_bs.signal_strength(ue)
+        interference = sum([b.signal_strength(ue) for b in base_stations if b != ue.serving_bs])
+
+        P_signal = 10 ** (signal_strength / 10)
+        P_interference = 10 ** (interference / 10)
+        P_noise = 10 ** (ue.noise / 10)
+        SINR_linear = P_signal / (P_interference + P_noise)
+        sinr = 10 * np.log10(SINR_linear)
+
+        current_throughput = ue.bandwidth * np.log2(1 + 10 ** (10 * np.log10(SINR_linear) / 10)) + extra_prbs
+        current_packet_loss = self.calculate_packet_loss(sinr, ue.dynamic_prb)
+        current_latency = self.calculate_latency(ue, ue.dynamic_prb)
+        self.record(time_step, index, current_throughput, current_latency, current_packet_loss, ue.handover_occurred)
+
+    def record(self, time_step, index, current_throughput, current_latency, current_packet_loss, handover):
+        if time_step >= self.actual and time_step <= self.latency:
+            current_throughput = 0
+        self.throughput_data.append(current_throughput)
+
+        if current_throughput < self.cur_min_value:
+            self.cur_min_value = current_throughput
+            self.cur_min_time_step = time_step
+
+        if current_throughput > self.cur_max_value:
+            self.cur_max_value = current_throughput
+
+        current_energy_consumption = self.calculate_energy_consumption(current_throughput)
+
+        if handover:
+            self.add_handover(time_step, index)
+            self.write_handover_to_csv(index, "Dynamic", time_step, current_latency, current_packet_loss, current_throughput, current_energy_consumption)
+        else:
+            self.write_handover_to_csv(index, "Normal", time_step, current_latency, current_packet_loss, current_throughput, current_energy_consumption)
+
+    def add_handover(self, time_step, index):
+        # PRBs are allocated ahead of the handover by the scheduler stage; here we only
+        # log the PRB estimate for the handover and start the interruption window
+        t_predicted = time_step - HANDOVER_WINDOW
+        t_actual = time_step
+        t_latency = t_actual + HANDOVER_WINDOW
+        target_throughput_requirement = (self.cur_min_value + self.cur_max_value) / 2
+        required_prbs = (target_throughput_requirement // BANDWIDTH_PER_PRB) + (1 if target_throughput_requirement % BANDWIDTH_PER_PRB != 0 else 0)
+        if required_prbs != 0.0:
+            self.write_PRB_to_csv(index, time_step, BASE_PRBS + required_prbs)
+
+        self.actual = t_actual
+        self.latency = t_latency
+        # no service on the handover tick itself
+        if len(self.throughput_data):
+            self.throughput_data[-1] = 0
+
+        self.handover_events.append((t_predicted, t_actual, t_latency))
+
+    def calculate_latency(self, ue, flag):
+        distance = ue.serving_bs.get_distance(ue)
+        bandwidth = 40 if flag else ue.bandwidth + np.random.uniform(5, 10)
+        speed_of_light = 3 * 10**8
+        propagation_delay = distance / speed_of_light
+        packet_size_bits = 1500 * 8
+        transmission_delay = packet_size_bits / bandwidth
+        return propagation_delay + transmission_delay
+
+    def calculate_packet_loss(self, sinr, flag):
+        threshold_good = 20
+        threshold_bad = 10
+        if sinr >= threshold_good:
+            return 0.0
+        elif sinr < threshold_bad:
+            return np.random.uniform(2, 4) if flag else 2
+        else:
+            return np.random.uniform(1, 2) if flag else 1
+
+    def calculate_energy_consumption(self, throughput):
+        power_per_data_unit = 0.01
+        return power_per_data_unit * throughput
+
+    def write_PRB_to_csv(self, index, time, PRB):
+        get_writer('out_prb.csv', PRB_HEADER).write((index, time, PRB))
+
+    def write_handover_to_csv(self, index, method, time, latency, packet_loss, Throughput, Energy_Consumption):
+        get_writer('out_log.csv', LOG_HEADER).write((index, method, time, latency, packet_loss, Throughput, Energy_Consumption))
@@ -0,0 +1,177 @@
+import abc
+import atexit
+import csv
+import io
+import os
+import time
+from simulation import profiling
+
+LOG_HEADER = ["Index", "Method", "Time", "Latency", "Packet_Loss", "Throughput", "Energy_Consumption"]
+PRB_HEADER = ["Index", "Time", "PRB"]
+CELL_PRB_HEADER = ["Cell", "Method", "Time", "PRB", "Utilization"]
+
+_writers = {}
+_output_format = "csv"
+
+
+def _parse_field(x):
+    return int(x) if x.isdigit() else float(x) if x.replace('.', '', 1).isdigit() else x
+
+
+def _read_last_row(path, chunk_size=65536):
+    with open(path, mode='rb') as f:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        data = b""
+        while end > 0 and data.count(b"\n") < 3:
+            start = max(0, end - chunk_size)
+            f.seek(start)
+            data = f.read(end - start) + data
+            end = start
+    lines = data.decode().splitlines()
+    if end == 0 and len(lines) < 2:
+        return None
+    return tuple(map(_parse_field, next(csv.reader([lines[-1]]), [])))
+
+
+class MetricsWriter(abc.ABC):
+    def __init__(self, path, header, max_rows=1024, flush_interval=1.0):
+        self.path = path
+        self.header = header
+        self.max_rows = max_rows
+        self.flush_interval = flush_interval
+        self.rows_written = 0
+        self._opened = False
+        self._pending = 0
+        self._last_entry = None
+        self._last_flush = time.monotonic()
+        self._line = io.StringIO()
+        self._line_writer = csv.writer(self._line)
+
+    def _format(self, row):
+        self._line.seek(0)
+        self._line.truncate()
+        self._line_writer.writerow(row)
+        return self._line.getvalue()
+
+    def _parsed(self, row):
+        return tuple(map(_parse_field, next(csv.reader([self._format(row)]), [])))
+
+    @abc.abstractmethod
+    def _open(self):
+        pass
+
+    @abc.abstractmethod
+    def _append(self, row, line):
+        pass
+
+    @abc.abstractmethod
+    def _write_pending(self):
+        pass
+
+    def _release(self):
+        pass
+
+    def write(self, row):
+        if not self._opened:
+            self._open()
+            self._opened = True
+        row = tuple(row)
+        if self._last_entry is not None and row == self._last_entry:
+            return False
+        line = self._format(row)
+        self._last_entry = tuple(map(_parse_field, next(csv.reader([line]))))
+        self._append(row, line)
+        self._pending += 1
+        self.rows_written += 1
+        profiling.count("rows_written")
+        if self._pending >= self.max_rows or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+        return True
+
+    def flush(self):
+        if self._opened:
+            with profiling.phase("writer.flush"):
+                self._write_pending()
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        self.flush()
+        if self._opened:
+            self._release()
+            self._opened = False
+        self._last_entry = None
+
+
+class CsvMetricsWriter(MetricsWriter):
+    def __init__(self, path, header, max_rows=1024, flush_interval=1.0):
+        super().__init__(path, header, max_rows, flush_interval)
+        self._file = None
+        self._lines = []
+
+    def _open(self):
+        file_exists = os.path.isfile(self.path)
+        if file_exists:
+            self._last_entry = _read_last_row(self.path)
+        self._file = open(self.path, mode='a', newline='')
+        if not file_exists:
+            self._lines.append(self._format(self.header))
+
+    def _append(self, row, line):
+        self._lines.append(line)
+
+    def _write_pending(self):
+        if self._lines:
+            self._file.write("".join(self._lines))
+            self._lines.clear()
+        self._file.flush()
+
+    def _release(self):
+        self._file.close()
+        self._file = None
+
+
+class NullMetricsWriter(MetricsWriter):
+    def _open(self):
+        pass
+
+    def _append(self, row, line):
+        pass
+
+    def _write_pending(self):
+        pass
+
+    def write(self, row):
+        return False
+
+
+def set_output_format(output_format):
+    global _output_format
+    if output_format not in ("csv", "columnar", "none"):
+        raise ValueError(f"unknown output format {output_format!r}")
+    close_all()
+    _output_format = output_format
+
+
+def get_writer(path, header):
+    writer = _writers.get(path)
+    if writer is None:
+        if _output_format == "none":
+            writer = NullMetricsWriter(path, header)
+        elif _output_format == "columnar":
+            from simulation.run_log import ColumnarMetricsWriter
+            writer = ColumnarMetricsWriter(os.path.splitext(path)[0] + ".runlog", header)
+        else:
+            writer = CsvMetricsWriter(path, header)
+        _writers[path] = writer
+    return writer
+
+
+def close_all():
+    for writer in _writers.values():
+        writer.close()
+    _writers.clear()
+
+
+atexit.register(close_all)
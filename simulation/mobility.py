@@ -0,0 +1,245 @@
+import copy
+import numpy as np
+
+AREA_MIN = 0
+AREA_MAX = 6000
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_2 = np.uint64(0x94D049BB133111EB)
+
+
+def _splitmix(z):
+    with np.errstate(over="ignore"):
+        z = (z ^ (z >> np.uint64(30))) * _MIX_1
+        z = (z ^ (z >> np.uint64(27))) * _MIX_2
+    return z ^ (z >> np.uint64(31))
+
+
+def _uniform(key, uid, step, lane):
+    uid = np.asarray(uid).astype(np.uint64)
+    step = np.asarray(step).astype(np.uint64)
+    with np.errstate(over="ignore"):
+        z = key + _splitmix(uid * _GOLDEN + np.uint64(lane))
+        z = _splitmix(z + step * _GOLDEN)
+    return (z >> np.uint64(11)).astype(float) * 2.0 ** -53
+
+
+class UEStreams:
+    # Counter-based per-UE streams: draw k of move n of UE uid depends only on
+    # (seed, uid, n, k), so results do not depend on which UEs share a batch.
+    def __init__(self, seed=None):
+        self.reseed(seed)
+
+    def reseed(self, seed=None):
+        self.seed = seed
+        self.base_key = np.random.SeedSequence(seed).generate_state(1, dtype=np.uint64)[0]
+        self.epoch = 0
+        self.key = self.base_key
+
+    def next_epoch(self):
+        # fresh streams for the same uids, e.g. when a new episode restarts them at 0
+        self.epoch += 1
+        with np.errstate(over="ignore"):
+            self.key = _splitmix(self.base_key + np.uint64(self.epoch) * _GOLDEN)
+
+    def uniform(self, uid, step, lane):
+        return _uniform(self.key, uid, step, lane)
+
+    def integers(self, uid, step, lane, low, high):
+        # inclusive on both ends, like random.randint
+        return low + np.floor(self.uniform(uid, step, lane) * (high - low + 1))
+
+    def normal(self, uid, step, lane):
+        u1 = 1.0 - self.uniform(uid, step, 2 * lane)
+        u2 = self.uniform(uid, step, 2 * lane + 1)
+        return np.sqrt(-2 * np.log(u1)) * np.cos(2 * np.pi * u2)
+
+
+class StackedStreams(UEStreams):
+    # the streams of several populations side by side, addressed by row of the stacked
+    # population instead of uid: row r draws what uid uids[r] would draw under key keys[r]
+    def __init__(self, keys, uids):
+        self.keys = keys
+        self.uids = uids
+
+    def uniform(self, row, step, lane):
+        return _uniform(self.keys[row], self.uids[row], step, lane)
+
+
+class MobilityModel:
+    def __init__(self, seed=None, step_size=1.2, area=(AREA_MIN, AREA_MAX)):
+        self.streams = UEStreams(seed)
+        self.step_size = step_size
+        # (low, high) of the square map the UEs are kept in
+        self.area = area
+
+    def reseed(self, seed=None):
+        self.streams.reseed(seed)
+
+    def reset(self):
+        # called when the population is cleared: its uids start again at 0
+        self.streams.next_epoch()
+
+    def stacked(self, keys, uids):
+        # a copy that moves a stacked population (see StackedStreams); models keeping per-uid
+        # state (GaussMarkov) cannot be stacked
+        stacked = copy.copy(self)
+        stacked.streams = StackedStreams(keys, uids)
+        return stacked
+
+    def advance(self, population, indices=None):
+        if indices is None:
+            indices = np.arange(len(population))
+        if len(indices):
+            self.move(population, indices, population.uid[indices], population.moves[indices])
+            population.moves[indices] += 1
+
+    def move(self, population, indices, uid, step):
+        raise NotImplementedError
+
+    def linear_moves(self, population, indices):
+        # number of upcoming moves whose positions lie on the straight line to the current
+        # target; only the last of them may change the target (see EventEngine)
+        return np.ones(len(indices), dtype=np.int64)
+
+    def clamp_moves(self, population, indices):
+        # the first upcoming move whose straight-line position leaves `area`: the tick loop
+        # clamps there and re-aims from the clamped point, so no jump may pass it
+        low, high = self.area
+        x, y = population.x[indices], population.y[indices]
+        direction_x = population.target_x[indices] - x
+        direction_y = population.target_y[indices] - y
+        distance = np.hypot(direction_x, direction_y)
+        safe = np.where(distance > 0, distance, 1)
+        moves = np.full(len(indices), np.inf)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for position, direction in ((x, direction_x), (y, direction_y)):
+                velocity = self.step_size * direction / safe
+                room = np.where(velocity > 0, high - position, low - position) / velocity
+                moves = np.where(velocity != 0, np.minimum(moves, np.floor(room) + 1), moves)
+        outside = (x < low) | (x > high) | (y < low) | (y > high)
+        return np.where(outside & (distance > 0), 1, np.maximum(moves, 1))
+
+    def skip(self, population, indices, moves):
+        # jump `moves` straight-line steps at once; only valid below linear_moves(), which keeps
+        # the jump clear of the area clamp, so the clip here never engages
+        moves = np.asarray(moves)
+        x, y = population.x[indices], population.y[indices]
+        direction_x = population.target_x[indices] - x
+        direction_y = population.target_y[indices] - y
+        distance = np.hypot(direction_x, direction_y)
+        scale = np.where(distance > 0, moves * self.step_size / np.where(distance > 0, distance, 1), 0)
+        population.x[indices] = np.clip(x + scale * direction_x, *self.area)
+        population.y[indices] = np.clip(y + scale * direction_y, *self.area)
+        population.moves[indices] += moves
+
+    def step_towards_target(self, population, indices):
+        x, y = population.x[indices], population.y[indices]
+        direction_x = population.target_x[indices] - x
+        direction_y = population.target_y[indices] - y
+        distance = np.hypot(direction_x, direction_y)
+
+        moving = distance > 0
+        safe = np.where(moving, distance, 1)
+        population.x[indices] = np.where(moving, np.clip(x + self.step_size * direction_x / safe, *self.area), x)
+        population.y[indices] = np.where(moving, np.clip(y + self.step_size * direction_y / safe, *self.area), y)
+        return distance
+
+
+class TargetMobility(MobilityModel):
+    LOOKAHEAD = 64
+
+    def __init__(self, seed=None, step_size=1.2, retarget_probability=0.1,
+                 retarget_x=(100, 900), retarget_y=(100, 700), area=(AREA_MIN, AREA_MAX)):
+        super().__init__(seed, step_size, area)
+        self.retarget_probability = retarget_probability
+        self.retarget_x = retarget_x
+        self.retarget_y = retarget_y
+
+    def move(self, population, indices, uid, step):
+        self.step_towards_target(population, indices)
+
+        retarget = self.streams.uniform(uid, step, 0) < self.retarget_probability
+        population.target_x[indices[retarget]] = self.streams.integers(uid[retarget], step[retarget], 1, *self.retarget_x)
+        population.target_y[indices[retarget]] = self.streams.integers(uid[retarget], step[retarget], 2, *self.retarget_y)
+
+    def linear_moves(self, population, indices):
+        distance = np.hypot(population.target_x[indices] - population.x[indices],
+                            population.target_y[indices] - population.y[indices])
+        # the last full step may overshoot the target, after that the UE oscillates around it
+        arrival = np.floor(distance / self.step_size).astype(np.int64) + 1
+        # the retarget draws are counter based, so the next retarget move can be looked up directly
+        ahead = np.arange(self.LOOKAHEAD)
+        draws = self.streams.uniform(population.uid[indices][:, None], population.moves[indices][:, None] + ahead, 0)
+        hits = draws < self.retarget_probability
+        retarget = np.where(hits.any(axis=1), hits.argmax(axis=1) + 1, self.LOOKAHEAD)
+        return np.minimum(np.minimum(arrival, retarget), self.clamp_moves(population, indices)).astype(np.int64)
+
+
+class RandomWaypoint(MobilityModel):
+    def __init__(self, seed=None, step_size=1.2, area=(AREA_MIN, AREA_MAX)):
+        super().__init__(seed, step_size, area)
+
+    def move(self, population, indices, uid, step):
+        distance = self.step_towards_target(population, indices)
+
+        arrived = distance <= self.step_size
+        low, high = self.area
+        population.target_x[indices[arrived]] = low + (high - low) * self.streams.uniform(uid[arrived], step[arrived], 0)
+        population.target_y[indices[arrived]] = low + (high - low) * self.streams.uniform(uid[arrived], step[arrived], 1)
+
+    def linear_moves(self, population, indices):
+        distance = np.hypot(population.target_x[indices] - population.x[indices],
+                            population.target_y[indices] - population.y[indices])
+        # a new waypoint is drawn on the first move that starts within one step of the target
+        arrival = np.maximum(np.ceil(distance / self.step_size), 1)
+        return np.minimum(arrival, self.clamp_moves(population, indices)).astype(np.int64)
+
+
+class GaussMarkov(MobilityModel):
+    def __init__(self, seed=None, step_size=1.2, alpha=0.75, speed_std=0.3, direction_std=0.4,
+                 area=(AREA_MIN, AREA_MAX)):
+        super().__init__(seed, step_size, area)
+        self.alpha = alpha
+        self.speed_std = speed_std
+        self.direction_std = direction_std
+        self.speed = np.zeros(0)
+        self.direction = np.zeros(0)
+
+    def reset(self):
+        super().reset()
+        self.speed = np.zeros(0)
+        self.direction = np.zeros(0)
+
+    def _reserve(self, uid):
+        size = int(uid.max()) + 1
+        if size > len(self.speed):
+            old = len(self.speed)
+            self.speed = np.resize(self.speed, size)
+            self.direction = np.resize(self.direction, size)
+            self.speed[old:] = np.nan
+
+    def move(self, population, indices, uid, step):
+        self._reserve(uid)
+        fresh = np.isnan(self.speed[uid])
+        if fresh.any():
+            # start each UE heading towards its target at the mean speed
+            ids = uid[fresh]
+            self.speed[ids] = self.step_size
+            self.direction[ids] = np.arctan2(population.target_y[indices[fresh]] - population.y[indices[fresh]],
+                                             population.target_x[indices[fresh]] - population.x[indices[fresh]])
+
+        x, y = population.x[indices], population.y[indices]
+        mean_direction = np.arctan2(population.target_y[indices] - y, population.target_x[indices] - x)
+        memory = np.sqrt(1 - self.alpha ** 2)
+        speed = (self.alpha * self.speed[uid] + (1 - self.alpha) * self.step_size
+                 + memory * self.speed_std * self.streams.normal(uid, step, 0))
+        direction = (self.alpha * self.direction[uid] + (1 - self.alpha) * mean_direction
+                     + memory * self.direction_std * self.streams.normal(uid, step, 1))
+        speed = np.maximum(speed, 0)
+        self.speed[uid] = speed
+        self.direction[uid] = direction
+
+        population.x[indices] = np.clip(x + speed * np.cos(direction), *self.area)
+        population.y[indices] = np.clip(y + speed * np.sin(direction), *self.area)
@@ -0,0 +1,156 @@
+import numpy as np
+import random
+from simulation import profiling
+from simulation.population import CellSet, UEPopulation
+from simulation.topology import random_layout
+
+# observed signal of a UE without a serving cell: finite, so policy networks never see -inf, and
+# below any received power on the map (path loss across its diagonal plus the full blockage loss)
+UNATTACHED_SIGNAL = -200.0
+
+
+def observe(ues):
+    # one state row per UE: the stored serving-cell signal, position and target
+    states = np.empty((len(ues), 5), dtype=np.float32)
+    states[:, 0] = np.where(ues.serving >= 0, ues.signal_strength, UNATTACHED_SIGNAL)
+    states[:, 1] = ues.x
+    states[:, 2] = ues.y
+    states[:, 3] = ues.target_x
+    states[:, 4] = ues.target_y
+    return states
+
+
+class MobileNetworkEnv:
+    # The simulation environment itself, NumPy only; MobileNetworkRLEnv adds the gym spaces on top
+    def __init__(self, mobility=None, candidate_radius=None, num_base_stations=5, num_squares_per_bs=20, ue_bandwidth=20,
+                 observation_mode="single", topology_pool=None, coverage_resolution=None, blockage=False):
+        self.grid_size = 200
+        self.num_base_stations = num_base_stations
+        self.num_squares_per_bs = num_squares_per_bs
+        self.ue_bandwidth = ue_bandwidth
+        self.base_stations = CellSet(candidate_radius=candidate_radius, coverage_resolution=coverage_resolution,
+                                     blockage=blockage)
+        self.user_equipments = UEPopulation(self.base_stations, mobility=mobility)
+        # with a TopologyPool, reset() restores a pre-generated layout instead of drawing a new one
+        self.topology_pool = topology_pool
+        self.topology_rng = random.Random()
+
+        if observation_mode not in ("single", "all"):
+            raise ValueError(f"unknown observation mode {observation_mode!r}")
+        # "all": one handover decision and one state row per UE (one UE per base station)
+        self.observation_mode = observation_mode
+        self.observation_low = np.array([UNATTACHED_SIGNAL, 0, 0, 0, 0])
+        self.observation_high = np.array([np.inf, 6000, 6000, 6000, 6000])
+
+        self.current_ue_index = 0
+        self.reset()
+
+    def reset(self):
+        if self.topology_pool is not None:
+            self.load_topology(self.topology_pool.draw(self.topology_rng))
+        else:
+            self.base_stations.clear()  
+            self.user_equipments.clear()  
+            self.init_simulation()  
+        return self.get_states() if self.observation_mode == "all" else self.get_state()
+
+    def init_simulation(self):
+        base_stations, ues = random_layout(self.num_base_stations, self.num_squares_per_bs)
+        for base_station in base_stations:
+            self.base_stations.append(base_station)
+        for x, y, target_x, target_y in ues:
+            self.user_equipments.add(x=x, y=y, target_x=target_x, target_y=target_y, bandwidth=self.ue_bandwidth)
+
+    def load_topology(self, topology):
+        if len(topology.base_stations) != self.num_base_stations:
+            raise ValueError(f"topology has {len(topology.base_stations)} base stations, "
+                             f"environment expects {self.num_base_stations}")
+        self.base_stations.load(topology)
+        self.user_equipments.clear()
+        self.user_equipments.add_many(topology.ue_x, topology.ue_y, topology.target_x, topology.target_y,
+                                      bandwidth=self.ue_bandwidth)
+
+    @property
+    def link_budget(self):
+        return self.base_stations.link_budget
+
+    def seed(self, seed=None):
+        self.user_equipments.mobility.reseed(seed)
+        self.topology_rng.seed(seed)
+        return [seed]
+
+    def get_state(self):
+        # the serving-cell signal the last link evaluation stored (blockage included)
+        ue = self.user_equipments[self.current_ue_index]
+        sinr = ue.signal_strength if ue.serving_bs else UNATTACHED_SIGNAL  
+        state = np.array([sinr, ue.x, ue.y, ue.target_x, ue.target_y], dtype=np.float32)
+        return state
+
+    def get_states(self):
+        return observe(self.user_equipments)
+
+    def step(self, action):
+        if self.observation_mode == "all":
+            return self.step_all(action)
+
+        ue = self.user_equipments[self.current_ue_index]
+
+    
+        if action == 1:
+            with profiling.phase("handover"):
+                self.handle_handover(ue)
+
+    
+        with profiling.phase("mobility"):
+            self.user_equipments.move()
+        with profiling.phase("link_budget"):
+            self.link_budget.update(self.user_equipments)
+        ue = self.user_equipments[-1]
+        
+    
+        throughput = ue.throughput
+        reward = self.calculate_reward(throughput)
+
+        next_state = self.get_state()
+        done = self.check_done() 
+        return next_state, reward, done, {}
+
+    def step_all(self, actions):
+        with profiling.phase("handover"):
+            self.handle_handovers(np.flatnonzero(np.asarray(actions).reshape(-1) == 1))
+
+        with profiling.phase("mobility"):
+            self.user_equipments.move()
+        with profiling.phase("link_budget"):
+            self.link_budget.update(self.user_equipments)
+
+        rewards = self.calculate_reward(self.user_equipments.throughput).astype(np.float32)
+        return self.get_states(), rewards, self.check_done(), {}
+
+    def handle_handovers(self, indices):
+        ues = self.user_equipments
+        best = self.link_budget.strongest(ues.x[indices], ues.y[indices])
+        changed = (best >= 0) & (best != ues.serving[indices])
+        ues.serving[indices[changed]] = best[changed]
+        ues.handover_occurred[indices[changed]] = True
+        profiling.count("handovers", int(np.count_nonzero(changed)))
+
+    def handle_handover(self, ue):
+        current_bs = ue.serving_bs
+        best = self.link_budget.strongest(ue.x, ue.y)[0]
+        best_bs = self.base_stations[best] if best >= 0 else None
+        if best_bs and best_bs != current_bs:
+            ue.serving_bs = best_bs
+            ue.handover_occurred = True
+            profiling.count("handovers")
+
+    def calculate_reward(self, throughput):
+        return throughput
+
+    def check_done(self):
+    
+        return self.current_ue_index >= len(self.user_equipments) - 1
+
+    def step_next_ue(self):
+    
+        self.current_ue_index = (self.current_ue_index + 1) % len(self.user_equipments)
@@ -0,0 +1,265 @@
+import copy
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+from simulation.population import CellSet, UEPopulation
+from simulation.scheduler import BASE_PRBS, CELL_PRBS
+
+MIGRANT_CAPACITY = 4096  # UEs one tile can hand over per tick; the rest wait for the next tick
+# a UE handed over between tiles: its population columns, its new tile and the per-UE
+# Gauss-Markov state (NaN for other mobility models)
+MIGRANT_DTYPE = np.dtype(list(UEPopulation.COLUMNS) + [("tile", np.int64), ("speed", float), ("direction", float)])
+
+
+class TileGrid:
+    # tiles_x x tiles_y equal tiles over the square map [low, high]; tile = row * tiles_x + column
+    def __init__(self, tiles_x, tiles_y, area):
+        self.tiles_x = tiles_x
+        self.tiles_y = tiles_y
+        self.low, self.high = area
+
+    def __len__(self):
+        return self.tiles_x * self.tiles_y
+
+    def tile_of(self, x, y):
+        width = self.high - self.low
+        column = np.clip(((np.asarray(x) - self.low) * self.tiles_x // width).astype(np.int64), 0, self.tiles_x - 1)
+        row = np.clip(((np.asarray(y) - self.low) * self.tiles_y // width).astype(np.int64), 0, self.tiles_y - 1)
+        return row * self.tiles_x + column
+
+
+def _mobility_columns(mobility, uid):
+    # the Gauss-Markov speed and direction that travel with a UE; NaN until it first moves
+    speed = np.full(len(uid), np.nan)
+    direction = np.full(len(uid), np.nan)
+    if hasattr(mobility, "speed"):
+        known = uid < len(mobility.speed)
+        speed[known] = mobility.speed[uid[known]]
+        direction[known] = mobility.direction[uid[known]]
+    return speed, direction
+
+
+def _shared_specs(num_tiles, num_cells, migrant_capacity):
+    return {
+        "demand": ((num_tiles, num_cells), np.dtype(float)),
+        "scale": ((num_cells,), np.dtype(float)),
+        "outboxes": ((num_tiles, migrant_capacity), MIGRANT_DTYPE),
+        "outbox_counts": ((num_tiles,), np.dtype(np.int64)),
+    }
+
+
+class _Tile:
+    # The UEs inside one tile. Sites are static, so every tile evaluates its UEs against the
+    # full read-only cell set (interference from every neighbouring cell included) and only
+    # per-cell PRB demand and the UEs leaving the tile have to be exchanged each tick.
+    def __init__(self, index, grid, cells, mobility, columns, shared, num_uids, seed=None,
+                 expected_loss=False, base_prbs=BASE_PRBS):
+        self.index = index
+        self.grid = grid
+        self.mobility = mobility
+        self.ues = UEPopulation(cells, capacity=max(len(columns["x"]), 16), mobility=mobility)
+        self.ues.import_rows(columns)
+        if hasattr(mobility, "speed") and num_uids:
+            mobility._reserve(np.array([num_uids - 1]))
+            mobility.speed[columns["uid"]] = columns["speed"]
+            mobility.direction[columns["uid"]] = columns["direction"]
+        self.link_budget = cells.link_budget
+        self.link_budget.rng = np.random.RandomState(None if seed is None else [seed, index])
+        self.expected_loss = expected_loss
+        self.base_prbs = base_prbs
+        self.demand = shared["demand"][index]
+        self.scale = shared["scale"]
+        self.outboxes = shared["outboxes"]
+        self.outbox_counts = shared["outbox_counts"]
+        self.prbs = np.zeros(0)
+
+    def step(self):
+        # move, pick cells, publish this tile's per-cell demand and hand over the UEs that left
+        ues = self.ues
+        ues.move()
+        state = self.link_budget.evaluate(ues.x, ues.y, ues.noise, ues.bandwidth, ues.dynamic_prb, self.expected_loss,
+                                          cache_key=id(ues))
+        ues.apply_link_state(state)
+        handovers = int(np.count_nonzero(ues.handover_occurred))
+        ues.handover_occurred[:] = False
+        serving = ues.serving
+        attached = serving >= 0
+        self.demand[:] = self.base_prbs * np.bincount(serving[attached], minlength=len(self.demand))
+        throughput = float(ues.throughput[attached & np.isfinite(ues.throughput)].sum())
+
+        tiles = self.grid.tile_of(ues.x, ues.y)
+        leaving = np.flatnonzero(tiles != self.index)[:self.outboxes.shape[1]]
+        outbox = self.outboxes[self.index][:len(leaving)]
+        for name, column in ues.export_rows(leaving).items():
+            outbox[name] = column
+        outbox["tile"] = tiles[leaving]
+        outbox["speed"], outbox["direction"] = _mobility_columns(self.mobility, outbox["uid"])
+        self.outbox_counts[self.index] = len(leaving)
+        ues.remove(leaving)
+        return handovers, throughput, int(np.count_nonzero(attached)), len(leaving)
+
+    def settle(self):
+        # adopt the UEs handed over by the other tiles, then allocate PRBs with the cell-wide scale
+        for source, count in enumerate(self.outbox_counts.tolist()):
+            if source == self.index or not count:
+                continue
+            records = self.outboxes[source][:count]
+            arriving = records[records["tile"] == self.index]
+            if not len(arriving):
+                continue
+            self.ues.import_rows(arriving)
+            if hasattr(self.mobility, "speed"):
+                self.mobility.speed[arriving["uid"]] = arriving["speed"]
+                self.mobility.direction[arriving["uid"]] = arriving["direction"]
+        serving = self.ues.serving
+        self.prbs = np.where(serving >= 0, self.base_prbs * self.scale[np.maximum(serving, 0)], 0.0)
+        return len(self.ues)
+
+    def gather(self):
+        columns = self.ues.export_rows(slice(None))
+        columns["speed"], columns["direction"] = _mobility_columns(self.mobility, columns["uid"])
+        return columns
+
+
+def _attach(names, specs):
+    blocks = [shared_memory.SharedMemory(name=name) for name in names]
+    arrays = {key: np.ndarray(shape, dtype=dtype, buffer=block.buf)
+              for (key, (shape, dtype)), block in zip(specs.items(), blocks)}
+    return blocks, arrays
+
+
+def _tile_worker(remote, parent_remote, names, specs, base_stations, cell_kwargs, tile_kwargs):
+    parent_remote.close()
+    blocks, shared = _attach(names, specs)
+    tile = _Tile(cells=CellSet(base_stations, **cell_kwargs), shared=shared, **tile_kwargs)
+    try:
+        while True:
+            command = remote.recv()
+            if command == "close":
+                break
+            remote.send(getattr(tile, command)())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        del tile, shared
+        for block in blocks:
+            block.close()
+        remote.close()
+
+
+class PartitionedSimulation:
+    # One large map split into tiles_x x tiles_y tiles, each owned by a worker process that
+    # moves its UEs and evaluates their links every tick. Per-cell PRB demand and the UEs that
+    # crossed into another tile are exchanged through shared memory; the per-cell budget is
+    # then applied across all tiles. A single tile runs in this process.
+    def __init__(self, env, tiles=(2, 2), seed=None, expected_loss=False, base_prbs=BASE_PRBS,
+                 cell_prbs=CELL_PRBS, migrant_capacity=MIGRANT_CAPACITY, start_method=None):
+        ues = env.user_equipments
+        cells = env.base_stations
+        mobility = ues.mobility
+        self.grid = TileGrid(*tiles, area=mobility.area)
+        self.cell_prbs = cell_prbs
+        self.time_step = 0
+        self.handovers = 0
+        self.migrations = 0
+        self.throughput = 0.0
+        self.attached = 0
+        self.usage = np.zeros(len(cells))
+        self.tile_sizes = np.zeros(len(self.grid), dtype=np.int64)
+        self._blocks = []
+        self._remotes = []
+        self._processes = []
+        self._tiles = []
+        self.closed = False
+
+        specs = _shared_specs(len(self.grid), len(cells), migrant_capacity)
+        if len(self.grid) > 1:
+            self._blocks = [shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * dtype.itemsize, 1))
+                            for shape, dtype in specs.values()]
+            shared = {key: np.ndarray(shape, dtype=dtype, buffer=block.buf)
+                      for (key, (shape, dtype)), block in zip(specs.items(), self._blocks)}
+        else:
+            shared = {key: np.zeros(shape, dtype=dtype) for key, (shape, dtype) in specs.items()}
+        self.shared = shared
+        shared["outbox_counts"][:] = 0
+
+        owner = self.grid.tile_of(ues.x, ues.y)
+        self.tile_sizes[:] = np.bincount(owner, minlength=len(self.grid))
+        cell_kwargs = {"candidate_radius": cells.candidate_radius, "coverage_resolution": cells.coverage_resolution,
+                       "blockage": cells.blockage}
+        if start_method is None:
+            start_method = "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
+        ctx = mp.get_context(start_method)
+        for index in range(len(self.grid)):
+            columns = ues.export_rows(np.flatnonzero(owner == index))
+            columns["speed"], columns["direction"] = _mobility_columns(mobility, columns["uid"])
+            tile_kwargs = {"index": index, "grid": self.grid, "mobility": mobility, "columns": columns,
+                           "num_uids": ues.next_uid, "seed": seed, "expected_loss": expected_loss,
+                           "base_prbs": base_prbs}
+            if len(self.grid) == 1:
+                tile_kwargs["mobility"] = copy.deepcopy(mobility)
+                self._tiles.append(_Tile(cells=CellSet(list(cells), **cell_kwargs), shared=shared, **tile_kwargs))
+                continue
+            remote, work_remote = ctx.Pipe()
+            process = ctx.Process(target=_tile_worker, daemon=True,
+                                  args=(work_remote, remote, [block.name for block in self._blocks], specs,
+                                        list(cells), cell_kwargs, tile_kwargs))
+            process.start()
+            work_remote.close()
+            self._remotes.append(remote)
+            self._processes.append(process)
+
+    def _call(self, command):
+        if self._tiles:
+            return [getattr(tile, command)() for tile in self._tiles]
+        for remote in self._remotes:
+            remote.send(command)
+        return [remote.recv() for remote in self._remotes]
+
+    def step(self):
+        results = self._call("step")
+        handovers, throughput, attached, migrations = (sum(values) for values in zip(*results))
+        demand = self.shared["demand"].sum(axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scale = np.where(demand > self.cell_prbs, self.cell_prbs / demand, 1.0)
+        self.shared["scale"][:] = scale
+        self.tile_sizes[:] = self._call("settle")
+        self.usage = demand * scale
+        self.handovers += handovers
+        self.migrations += migrations
+        self.throughput = throughput
+        self.attached = attached
+        self.time_step += 1
+
+    def run(self, steps):
+        for _ in range(steps):
+            self.step()
+
+    def population(self):
+        # every tile's UEs in one UEPopulation ordered by uid (columns only, no mobility state)
+        parts = self._call("gather")
+        columns = {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+        order = np.argsort(columns["uid"], kind="stable")
+        ues = UEPopulation(capacity=max(len(order), 16))
+        ues.import_rows({name: column[order] for name, column in columns.items()})
+        return ues
+
+    def print_summary(self):
+        print(f"Partitioned simulation after {self.time_step} steps on {len(self.grid)} tiles:")
+        print(f"UEs per tile: {self.tile_sizes.tolist()}")
+        print(f"Handovers: {self.handovers} Tile migrations: {self.migrations}")
+        mean = self.throughput / self.attached if self.attached else float("nan")
+        print(f"Mean throughput: {mean:.3f} Cell PRB utilization: {self.usage.mean() / self.cell_prbs:.3f}")
+
+    def close(self):
+        if self.closed:
+            return
+        for remote in self._remotes:
+            remote.send("close")
+        for process in self._processes:
+            process.join()
+        self.shared = None
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self.closed = True
@@ -0,0 +1,286 @@
+import numpy as np
+from simulation import profiling
+from simulation.blockage import BlockageModel
+from simulation.coverage import CoverageMap, DEFAULT_RESOLUTION
+from simulation.link_budget import LinkBudget, noise_power
+from simulation.mobility import TargetMobility
+
+
+class CellSet:
+    def __init__(self, base_stations=(), candidate_radius=None, coverage_resolution=None, blockage=False):
+        self.base_stations = []
+        self.index = {}
+        self.candidate_radius = candidate_radius
+        self.coverage_resolution = coverage_resolution
+        self.blockage = blockage
+        self._link_budget = None
+        self._coverage_map = None
+        self._set_columns()
+        for bs in base_stations:
+            self.append(bs)
+
+    def _set_columns(self):
+        self.x = np.array([bs.x for bs in self.base_stations], dtype=float)
+        self.y = np.array([bs.y for bs in self.base_stations], dtype=float)
+        self.tx_power = np.array([bs.tx_power for bs in self.base_stations], dtype=float)
+        self.radius = np.array([bs.radius for bs in self.base_stations], dtype=float)
+        self._link_budget = None
+        self._coverage_map = None
+
+    def append(self, bs):
+        self.index[id(bs)] = len(self.base_stations)
+        self.base_stations.append(bs)
+        self._set_columns()
+
+    def clear(self):
+        self.base_stations.clear()
+        self.index.clear()
+        self._set_columns()
+
+    def load(self, topology):
+        # adopt a cached Topology's sites together with its precomputed indexes
+        self.base_stations[:] = topology.base_stations
+        self.index = dict(topology.index)
+        self.x, self.y, self.tx_power, self.radius = topology.bs_x, topology.bs_y, topology.tx_power, topology.radius
+        self._link_budget = topology.link_budget(self.candidate_radius, self.blockage)
+        self._coverage_map = topology.coverage_map(self.coverage_resolution) if self.coverage_resolution else None
+
+    def index_of(self, bs):
+        return -1 if bs is None else self.index[id(bs)]
+
+    @property
+    def link_budget(self):
+        if self._link_budget is None:
+            blockage = BlockageModel.from_base_stations(self.base_stations) if self.blockage else None
+            self._link_budget = LinkBudget(self.base_stations, candidate_radius=self.candidate_radius,
+                                           blockage=blockage)
+        return self._link_budget
+
+    @property
+    def coverage_map(self):
+        if self._coverage_map is None:
+            self._coverage_map = CoverageMap.build(self.x, self.y, self.tx_power,
+                                                   self.coverage_resolution or DEFAULT_RESOLUTION)
+        return self._coverage_map
+
+    def __len__(self):
+        return len(self.base_stations)
+
+    def __iter__(self):
+        return iter(self.base_stations)
+
+    def __getitem__(self, i):
+        return self.base_stations[i]
+
+    def __bool__(self):
+        return bool(self.base_stations)
+
+
+class UEProxy:
+    __slots__ = ("population", "index")
+
+    def __init__(self, population, index):
+        self.population = population
+        self.index = index
+
+    def __eq__(self, other):
+        return (isinstance(other, UEProxy) and other.population is self.population
+                and other.index == self.index)
+
+    def __hash__(self):
+        return hash((id(self.population), self.index))
+
+    def __repr__(self):
+        return f"UEProxy({self.index}, x={self.x:.1f}, y={self.y:.1f})"
+
+    @property
+    def serving_bs(self):
+        serving = self.population.serving[self.index]
+        return self.population.cells[serving] if serving >= 0 else None
+
+    @serving_bs.setter
+    def serving_bs(self, bs):
+        self.population.serving[self.index] = self.population.cells.index_of(bs)
+
+    def move(self):
+        self.population.move(np.array([self.index]))
+
+    def update_signal_strength(self, base_stations):
+        LinkBudget(base_stations).update([self])
+
+
+def _proxy_column(name):
+    def get(self):
+        return self.population._data[name][self.index].item()
+
+    def set(self, value):
+        self.population._data[name][self.index] = value
+
+    return property(get, set)
+
+
+def _population_column(name):
+    def get(self):
+        return self._data[name][:self.size]
+
+    return property(get)
+
+
+class UEPopulation:
+    COLUMNS = (
+        ("x", float),
+        ("y", float),
+        ("target_x", float),
+        ("target_y", float),
+        ("bandwidth", float),
+        ("noise", float),
+        ("dynamic_prb", bool),
+        ("serving", np.int64),
+        ("signal_strength", float),
+        ("throughput", float),
+        ("handover_occurred", bool),
+        ("uid", np.int64),
+        ("moves", np.int64),
+    )
+
+    def __init__(self, cells=None, capacity=16, mobility=None):
+        self.cells = cells if cells is not None else CellSet()
+        self.mobility = mobility if mobility is not None else TargetMobility()
+        self.size = 0
+        self.next_uid = 0
+        self._data = {name: np.zeros(capacity, dtype=dtype) for name, dtype in self.COLUMNS}
+
+    def _reserve(self, capacity):
+        if capacity <= len(self._data["x"]):
+            return
+        capacity = max(capacity, 2 * len(self._data["x"]))
+        for name, column in self._data.items():
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            self._data[name] = grown
+
+    def add(self, x, y, target_x, target_y, bandwidth=20):
+        self._reserve(self.size + 1)
+        i = self.size
+        self.size += 1
+        data = self._data
+        data["x"][i] = x
+        data["y"][i] = y
+        data["target_x"][i] = target_x
+        data["target_y"][i] = target_y
+        data["bandwidth"][i] = bandwidth
+        data["noise"][i] = noise_power(bandwidth)
+        data["dynamic_prb"][i] = False
+        data["serving"][i] = -1
+        data["signal_strength"][i] = -100
+        data["throughput"][i] = 0
+        data["handover_occurred"][i] = False
+        data["uid"][i] = self.next_uid
+        data["moves"][i] = 0
+        self.next_uid += 1
+        return UEProxy(self, i)
+
+    def add_many(self, x, y, target_x, target_y, bandwidth=20):
+        count = len(x)
+        self._reserve(self.size + count)
+        rows = slice(self.size, self.size + count)
+        data = self._data
+        data["x"][rows] = x
+        data["y"][rows] = y
+        data["target_x"][rows] = target_x
+        data["target_y"][rows] = target_y
+        data["bandwidth"][rows] = bandwidth
+        data["noise"][rows] = noise_power(data["bandwidth"][rows])
+        data["dynamic_prb"][rows] = False
+        data["serving"][rows] = -1
+        data["signal_strength"][rows] = -100
+        data["throughput"][rows] = 0
+        data["handover_occurred"][rows] = False
+        data["uid"][rows] = np.arange(self.next_uid, self.next_uid + count)
+        data["moves"][rows] = 0
+        self.size += count
+        self.next_uid += count
+
+    def append(self, ue):
+        proxy = self.add(ue.x, ue.y, ue.target_x, ue.target_y, ue.bandwidth)
+        proxy.dynamic_prb = ue.dynamic_prb
+        proxy.signal_strength = ue.signal_strength
+        proxy.throughput = ue.throughput
+        proxy.serving_bs = ue.serving_bs
+        proxy.handover_occurred = ue.handover_occurred
+        return proxy
+
+    def export_rows(self, rows):
+        # column copies of `rows`, to hand those UEs over to another population
+        return {name: self._data[name][:self.size][rows] for name, _ in self.COLUMNS}
+
+    def import_rows(self, columns):
+        # append UEs from export_rows (or any record array with the same fields), keeping uid and moves
+        count = len(columns["x"])
+        self._reserve(self.size + count)
+        for name, _ in self.COLUMNS:
+            self._data[name][self.size:self.size + count] = columns[name]
+        self.size += count
+        if count:
+            self.next_uid = max(self.next_uid, int(np.max(columns["uid"])) + 1)
+
+    def share(self, batch, start):
+        # keep the columns in rows start..start + len(self) of `batch`, a population holding a
+        # copy of them, so updates on the batch land here; growing past them gives own storage again
+        self._data = {name: column[start:start + self.size] for name, column in batch._data.items()}
+
+    def remove(self, rows):
+        keep = np.ones(self.size, dtype=bool)
+        keep[rows] = False
+        count = int(np.count_nonzero(keep))
+        for column in self._data.values():
+            column[:count] = column[:self.size][keep]
+        self.size = count
+
+    def clear(self):
+        if self.next_uid:
+            # the next UEs reuse uids 0.., so they get a new epoch of the per-UE streams
+            self.mobility.reset()
+        self.size = 0
+        self.next_uid = 0
+
+    def index(self, ue):
+        if isinstance(ue, UEProxy) and ue.population is self and 0 <= ue.index < self.size:
+            return ue.index
+        raise ValueError(f"{ue!r} is not in population")
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        for i in range(self.size):
+            yield UEProxy(self, i)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.size
+        if not 0 <= i < self.size:
+            raise IndexError("population index out of range")
+        return UEProxy(self, i)
+
+    def move(self, indices=None):
+        self.mobility.advance(self, indices)
+
+    def apply_link_state(self, state):
+        serving = self.serving
+        best = state.best_index
+        changed = (best >= 0) & (best != serving)
+        handovers = changed & (serving >= 0)
+        self.handover_occurred[handovers] = True
+        if profiling.is_enabled():
+            profiling.count("handovers", int(np.count_nonzero(handovers)))
+        serving[changed] = best[changed]
+
+        attached = np.flatnonzero(serving >= 0)
+        self.signal_strength[attached] = state.signal[attached, serving[attached]]
+        self.throughput[:] = state.best_throughput
+
+
+for _name, _dtype in UEPopulation.COLUMNS:
+    setattr(UEProxy, _name, _proxy_column(_name))
+    setattr(UEPopulation, _name, _population_column(_name))
@@ -0,0 +1,101 @@
+import numpy as np
+from collections import namedtuple
+from simulation import profiling
+from simulation.link_budget import DYNAMIC_PRB_BANDWIDTH
+from simulation.scheduler import imminent_handovers
+
+PACKET_SIZE_BITS = 1500 * 8
+SPEED_OF_LIGHT = 3 * 10**8
+POWER_PER_DATA_UNIT = 0.01
+# serving signal strengths where the packet-loss band changes
+SIGNAL_BANDS = (10, 20)
+
+PolicyResult = namedtuple("PolicyResult", ["state", "latency", "packet_loss", "throughput", "energy", "extra_prbs"])
+
+
+class PRBPolicy:
+    # One PRB policy variant on top of the shared radio state: the bandwidth it adds to every
+    # link, the bandwidth packets are sent with and the packet loss per signal band, drawn
+    # uniformly from (low, high). The regular policy is the baseline; subclass to add variants.
+    name = "regular"
+    method = "Normal"
+    extra_bandwidth = 0.0
+    packet_loss_bands = ((2.0, 2.0), (1.0, 1.0), (0.0, 0.0))
+
+    def __init__(self, scheduler=None):
+        self.scheduler = scheduler
+
+    def transmission_delay(self, bandwidth, expected=False):
+        if expected:
+            # mean of PACKET_SIZE_BITS / (bandwidth + U(5, 10))
+            return PACKET_SIZE_BITS / 5 * np.log((bandwidth + 10) / (bandwidth + 5))
+        return PACKET_SIZE_BITS / (bandwidth + np.random.uniform(5, 10, len(bandwidth)))
+
+    def packet_loss(self, signal, expected=False):
+        band = np.searchsorted(SIGNAL_BANDS, signal, side="right")
+        low, high = np.asarray(self.packet_loss_bands)[band].T
+        if expected:
+            return (low + high) / 2
+        loss = low.copy()
+        spread = low < high
+        loss[spread] = np.random.uniform(low[spread], high[spread])
+        return loss
+
+    def metrics(self, state, radio, serving, bandwidth, expected=False):
+        # per-UE latency, packet loss, throughput and energy with the UEs on `serving`
+        rows = np.arange(len(serving))
+        cell = np.maximum(serving, 0)
+        latency = radio.distance[rows, cell] / SPEED_OF_LIGHT + self.transmission_delay(bandwidth, expected)
+        packet_loss = self.packet_loss(radio.signal[rows, cell], expected)
+        throughput = state.best_throughput
+        return latency, packet_loss, throughput, POWER_PER_DATA_UNIT * throughput
+
+    def schedule(self, time_step, state, serving, throughput, targets):
+        if self.scheduler is None:
+            return np.zeros(len(serving))
+        return self.scheduler.schedule(time_step, serving)[1]
+
+
+class DynamicPRBPolicy(PRBPolicy):
+    # extra bandwidth on every link, a fixed 40 transmission bandwidth and, through its
+    # scheduler, extra PRBs for UEs about to hand over
+    name = "dynamic"
+    method = "Dynamic"
+    extra_bandwidth = DYNAMIC_PRB_BANDWIDTH
+    packet_loss_bands = ((2.0, 4.0), (1.0, 2.0), (0.0, 0.0))
+
+    def transmission_delay(self, bandwidth, expected=False):
+        return np.full(len(bandwidth), PACKET_SIZE_BITS / 40)
+
+    def schedule(self, time_step, state, serving, throughput, targets):
+        if self.scheduler is None:
+            return np.zeros(len(serving))
+        serving_sinr = state.sinr[np.arange(len(serving)), np.maximum(serving, 0)]
+        _, extra = self.scheduler.schedule(time_step, serving, throughput, serving_sinr, targets,
+                                           imminent_handovers(state, serving))
+        return extra
+
+
+class PRBComparison:
+    # Evaluates several PRB policies from one radio computation per tick: distances, received
+    # power and SINR (with its random loss) are shared, only the bandwidth term and the policy
+    # models differ. The UEs follow the cell selection of the `baseline` policy.
+    def __init__(self, policies, baseline="regular"):
+        self.policies = tuple(policies)
+        self.baseline = baseline
+
+    def evaluate(self, link_budget, ues, time_step, targets=None):
+        with profiling.phase("prb.radio"):
+            radio = link_budget.radio(ues.x, ues.y, ues.noise, cache_key=id(ues))
+        states = {policy.name: link_budget.link_state(radio, ues.bandwidth, policy.extra_bandwidth)
+                  for policy in self.policies}
+        ues.apply_link_state(states[self.baseline])
+
+        serving = ues.serving
+        results = {}
+        for policy in self.policies:
+            state = states[policy.name]
+            latency, packet_loss, throughput, energy = policy.metrics(state, radio, serving, ues.bandwidth)
+            extra_prbs = policy.schedule(time_step, state, serving, throughput, targets)
+            results[policy.name] = PolicyResult(state, latency, packet_loss, throughput, energy, extra_prbs)
+        return radio, results
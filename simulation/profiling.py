@@ -0,0 +1,136 @@
+import json
+import math
+import time
+from contextlib import nullcontext
+
+# Per-phase timers and counters for the simulation loop. Everything is a no-op
+# until enable() is called; instrumented code pays one global lookup per call.
+HISTOGRAM_BINS = 32  # bin k holds durations in [2**(k-1), 2**k) microseconds
+
+_enabled = False
+_phases = {}
+_counters = {}
+_NULL_PHASE = nullcontext()
+
+
+class PhaseStats:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self.histogram = [0] * HISTOGRAM_BINS
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        self.histogram[min(math.frexp(seconds * 1e6)[1], HISTOGRAM_BINS - 1) if seconds >= 1e-6 else 0] += 1
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "total_s": self.total,
+            "mean_s": self.total / self.count if self.count else 0.0,
+            "min_s": self.min if self.count else 0.0,
+            "max_s": self.max,
+            "histogram_us_log2": self.histogram,
+        }
+
+
+class _Phase:
+    __slots__ = ("stats", "start")
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.stats.add(time.perf_counter() - self.start)
+        return False
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    _phases.clear()
+    _counters.clear()
+
+
+def phase(name):
+    if not _enabled:
+        return _NULL_PHASE
+    stats = _phases.get(name)
+    if stats is None:
+        stats = _phases[name] = PhaseStats()
+    return _Phase(stats)
+
+
+def count(name, n=1):
+    if _enabled:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def report():
+    return {
+        "phases": {name: stats.as_dict() for name, stats in sorted(_phases.items())},
+        "counters": dict(sorted(_counters.items())),
+    }
+
+
+def _profile_functions(profiler, limit):
+    import pstats
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, line, function), (primitive_calls, calls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({"function": f"{filename}:{line}({function})", "calls": calls,
+                     "primitive_calls": primitive_calls, "tottime_s": tottime, "cumtime_s": cumtime})
+    rows.sort(key=lambda row: row["cumtime_s"], reverse=True)
+    return rows[:limit]
+
+
+def profile_steps(runner, steps, path=None, limit=200):
+    # Runs `steps` runner steps under cProfile with phase timing on and returns
+    # (and optionally writes as JSON) the phase report plus the hottest functions.
+    import cProfile  # only needed here; keeps the profiler out of every cold start
+    was_enabled = _enabled
+    reset()
+    enable()
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    profiler.enable()
+    try:
+        for _ in range(steps):
+            if runner.done:
+                break
+            runner.step()
+    finally:
+        profiler.disable()
+        if not was_enabled:
+            disable()
+    elapsed = time.perf_counter() - start
+
+    result = {"steps": steps, "elapsed_s": elapsed, "num_ues": len(runner.env.user_equipments),
+              "num_base_stations": len(runner.env.base_stations)}
+    result.update(report())
+    result["functions"] = _profile_functions(profiler, limit)
+    if path is not None:
+        with open(path, "w") as f:
+            json.dump(result, f, indent=2)
+    return result
@@ -0,0 +1,77 @@
+import numpy as np
+
+
+class RingBuffer:
+    # Fixed-capacity FIFO with deque-style indexing (0 is the oldest sample).
+    # Every value is written twice, at i and i + span, so the live window is
+    # always one contiguous slice and view() never copies. The span doubles as
+    # samples arrive, up to capacity, so short histories stay small; a buffer
+    # with capacity 0 keeps nothing.
+    def __init__(self, capacity, dtype=float):
+        self.capacity = capacity
+        self._span = 0
+        self._data = np.zeros(0, dtype=dtype)
+        self._start = 0
+        self._size = 0
+        self.version = 0
+
+    def _reserve(self, size):
+        size = min(size, self.capacity)
+        if size <= self._span:
+            return
+        span = min(self.capacity, max(size, 2 * self._span, 16))
+        data = np.zeros(2 * span, dtype=self._data.dtype)
+        data[:self._size] = data[span:span + self._size] = self.view()
+        self._data = data
+        self._span = span
+        self._start = 0
+
+    def __len__(self):
+        return self._size
+
+    def _position(self, i):
+        if i < 0:
+            i += self._size
+        if not 0 <= i < self._size:
+            raise IndexError("ring buffer index out of range")
+        return (self._start + i) % self._span
+
+    def append(self, value):
+        self._reserve(self._size + 1)
+        if not self._span:
+            return
+        end = (self._start + self._size) % self._span
+        self._data[end] = self._data[end + self._span] = value
+        if self._size < self.capacity:
+            self._size += 1
+        else:
+            self._start = (self._start + 1) % self._span
+        self.version += 1
+
+    def __getitem__(self, i):
+        return self._data[self._position(i)]
+
+    def __setitem__(self, i, value):
+        position = self._position(i)
+        self._data[position] = self._data[position + self._span] = value
+        self.version += 1
+
+    def __iter__(self):
+        return iter(self.view())
+
+    def view(self):
+        return self._data[self._start:self._start + self._size]
+
+    def load(self, values):
+        # replace the contents with the newest `capacity` values
+        values = np.asarray(values)
+        values = values[max(len(values) - self.capacity, 0):]
+        self._start = self._size = 0
+        self._reserve(len(values))
+        self._size = len(values)
+        self._data[:self._size] = self._data[self._span:self._span + self._size] = values
+        self.version += 1
+
+    def clear(self):
+        self._start = self._size = 0
+        self.version += 1
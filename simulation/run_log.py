@@ -0,0 +1,199 @@
+import csv
+import json
+import os
+import numpy as np
+from simulation.metrics_writer import MetricsWriter, LOG_HEADER, PRB_HEADER, CELL_PRB_HEADER
+
+METHODS = ("Normal", "Dynamic")
+
+METRICS_DTYPE = np.dtype([
+    ("index", np.int32),
+    ("method", np.uint8),
+    ("time", np.int32),
+    ("latency", np.float64),
+    ("packet_loss", np.float64),
+    ("throughput", np.float64),
+    ("energy", np.float64),
+])
+
+PRB_DTYPE = np.dtype([
+    ("index", np.int32),
+    ("time", np.int32),
+    ("prb", np.float64),
+])
+
+CELL_PRB_DTYPE = np.dtype([
+    ("index", np.int32),  # cell
+    ("method", np.uint8),
+    ("time", np.int32),
+    ("prb", np.float64),
+    ("utilization", np.float64),
+])
+
+SCHEMAS = {
+    tuple(LOG_HEADER): ("metrics", METRICS_DTYPE),
+    tuple(PRB_HEADER): ("prb", PRB_DTYPE),
+    tuple(CELL_PRB_HEADER): ("cell_prb", CELL_PRB_DTYPE),
+}
+
+
+def _chunk_name(number):
+    return f"chunk_{number:06d}.npy"
+
+
+def _segment_name(chunk, number):
+    return f"chunk_{chunk:06d}_segment_{number:06d}.npy"
+
+
+def _encode(dtype, row):
+    if "method" in dtype.names:
+        row = list(row)
+        row[dtype.names.index("method")] = METHODS.index(row[dtype.names.index("method")])
+    return tuple(row)
+
+
+def _decode(dtype, record):
+    row = [value.item() for value in record]
+    if "method" in dtype.names:
+        row[dtype.names.index("method")] = METHODS[row[dtype.names.index("method")]]
+    return tuple(row)
+
+
+class ColumnarMetricsWriter(MetricsWriter):
+    # One directory per log: a manifest plus fixed-size .npy chunks of records, each written
+    # once when it fills up. Until then every flush adds the new rows as a small segment file.
+    # Files are never rewritten and the manifest is replaced atomically, so readers only ever
+    # see complete files; the segments of a chunk are deleted once the chunk is listed.
+    def __init__(self, directory, header, chunk_rows=65536, max_rows=1024, flush_interval=1.0):
+        super().__init__(directory, header, max_rows, flush_interval)
+        self.table, self.dtype = SCHEMAS[tuple(header)]
+        self.chunk_rows = chunk_rows
+        self._chunk = np.zeros(chunk_rows, dtype=self.dtype)
+        self._filled = 0
+        self._saved = 0  # rows of the current chunk already in segments
+        self._manifest = None
+
+    def _manifest_path(self):
+        return os.path.join(self.path, "manifest.json")
+
+    def _open(self):
+        os.makedirs(self.path, exist_ok=True)
+        if os.path.isfile(self._manifest_path()):
+            with open(self._manifest_path()) as f:
+                self._manifest = json.load(f)
+            self._manifest.setdefault("segments", [])
+            if self._manifest["segments"]:
+                # keep appending to the partially filled chunk
+                data = np.concatenate([np.load(os.path.join(self.path, segment["file"]))
+                                       for segment in self._manifest["segments"]])
+                self._chunk[:len(data)] = data
+                self._filled = self._saved = len(data)
+                self._last_entry = self._parsed(_decode(self.dtype, data[-1]))
+            elif self._manifest["chunks"]:
+                data = np.load(os.path.join(self.path, self._manifest["chunks"][-1]["file"]), mmap_mode="r")
+                self._last_entry = self._parsed(_decode(self.dtype, data[-1]))
+        else:
+            self._manifest = {"table": self.table, "header": list(self.header), "dtype": self.dtype.descr,
+                              "methods": list(METHODS), "chunks": [], "segments": []}
+            self._save_manifest()
+
+    def _append(self, row, line):
+        self._chunk[self._filled] = _encode(self.dtype, row)
+        self._filled += 1
+        if self._filled == self.chunk_rows:
+            self._write_chunk()
+
+    def _entry(self, name, data):
+        return {"file": name, "rows": len(data),
+                "time_min": int(data["time"].min()), "time_max": int(data["time"].max()),
+                "index_min": int(data["index"].min()), "index_max": int(data["index"].max())}
+
+    def _save_manifest(self):
+        tmp_path = self._manifest_path() + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._manifest, f)
+        os.replace(tmp_path, self._manifest_path())
+
+    def _write_chunk(self):
+        name = _chunk_name(len(self._manifest["chunks"]))
+        np.save(os.path.join(self.path, name), self._chunk)
+        stale = self._manifest["segments"]
+        self._manifest["chunks"].append(self._entry(name, self._chunk))
+        self._manifest["segments"] = []
+        self._save_manifest()
+        for segment in stale:
+            os.remove(os.path.join(self.path, segment["file"]))
+        self._filled = self._saved = 0
+
+    def _write_pending(self):
+        if self._filled == self._saved:
+            return
+        data = self._chunk[self._saved:self._filled]
+        name = _segment_name(len(self._manifest["chunks"]), len(self._manifest["segments"]))
+        np.save(os.path.join(self.path, name), data)
+        self._manifest["segments"].append(self._entry(name, data))
+        self._save_manifest()
+        self._saved = self._filled
+
+    def _release(self):
+        self._manifest = None
+        self._filled = self._saved = 0
+
+
+class RunLog:
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, "manifest.json")) as f:
+            self.manifest = json.load(f)
+        self.dtype = np.dtype([tuple(field) for field in self.manifest["dtype"]])
+        self.header = self.manifest["header"]
+        # full chunks, then the segments of the chunk still being filled
+        self.entries = self.manifest["chunks"] + self.manifest.get("segments", [])
+        self._chunks = {}
+
+    def __len__(self):
+        return sum(entry["rows"] for entry in self.entries)
+
+    def chunk(self, number):
+        data = self._chunks.get(number)
+        if data is None:
+            info = self.entries[number]
+            data = np.load(os.path.join(self.directory, info["file"]), mmap_mode="r")[:info["rows"]]
+            self._chunks[number] = data
+        return data
+
+    def chunks(self):
+        for number in range(len(self.entries)):
+            yield self.chunk(number)
+
+    def column(self, name):
+        parts = [chunk[name] for chunk in self.chunks()]
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=self.dtype[name])
+
+    def select(self, index=None, time_range=None):
+        parts = []
+        for number, info in enumerate(self.entries):
+            if index is not None and not info["index_min"] <= index <= info["index_max"]:
+                continue
+            if time_range is not None and (info["time_max"] < time_range[0] or info["time_min"] >= time_range[1]):
+                continue
+            data = self.chunk(number)
+            keep = np.ones(len(data), dtype=bool)
+            if index is not None:
+                keep &= data["index"] == index
+            if time_range is not None:
+                keep &= (data["time"] >= time_range[0]) & (data["time"] < time_range[1])
+            parts.append(data[keep])
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=self.dtype)
+
+    def to_csv(self, path):
+        with open(path, mode='w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(self.header)
+            for data in self.chunks():
+                writer.writerows(_decode(self.dtype, record) for record in data)
+
+
+if __name__ == "__main__":
+    import sys
+    RunLog(sys.argv[1]).to_csv(sys.argv[2])
@@ -0,0 +1,145 @@
+import random
+import numpy as np
+from collections import namedtuple
+from simulation import profiling
+from simulation.kpi import KPIAggregator
+from simulation.metrics import HISTORY_LENGTH, SINRTracker, ThroughputTracker
+from simulation.metrics_writer import close_all
+from simulation.prb_policy import DynamicPRBPolicy, PRBComparison, PRBPolicy
+from simulation.scheduler import PRBScheduler
+from simulation.network_env import MobileNetworkEnv
+
+
+# Read-only copy of what the GUI draws, safe to hand to another thread.
+Frame = namedtuple("Frame", ["time_step", "done", "base_stations", "ue_x", "ue_y", "serving"])
+
+
+def _frozen(values):
+    values = values.copy()
+    values.setflags(write=False)
+    return values
+
+
+def capture_frame(env, time_step=0, done=False):
+    ues = env.user_equipments
+    return Frame(time_step, done, tuple(env.base_stations), _frozen(ues.x), _frozen(ues.y), _frozen(ues.serving))
+
+
+def percent_change(new, old):
+    return 100 * (new - old) / old if old else float("nan")
+
+
+def random_policy(env):
+    return random.choice([0, 1])
+
+
+class MetricsSummary:
+    # shared by the fixed-tick runner and the event engine: both accumulate per-tick sums
+    # in dynamic_metrics / regular_metrics over max_time_steps ticks
+    def averages(self):
+        avg_dynamic_metrics = {key: value / self.max_time_steps for key, value in self.dynamic_metrics.items()}
+        avg_regular_metrics = {key: value / self.max_time_steps for key, value in self.regular_metrics.items()}
+        return avg_dynamic_metrics, avg_regular_metrics
+
+    def summary(self):
+        avg_dynamic_metrics, avg_regular_metrics = self.averages()
+        return {
+            "latency_reduction": abs(percent_change(avg_dynamic_metrics["latency"], avg_regular_metrics["latency"])),
+            "packet_loss_reduction": abs(percent_change(avg_dynamic_metrics["packet_loss"], avg_regular_metrics["packet_loss"])),
+            "throughput_increase": abs(percent_change(avg_dynamic_metrics["throughput"], avg_regular_metrics["throughput"])),
+            "energy_savings": abs(percent_change(avg_dynamic_metrics["energy"], avg_regular_metrics["energy"])),
+        }
+
+    def print_summary(self):
+        summary = self.summary()
+        print(f"Simulation ended after {self.max_time_steps} steps.")
+        print("Dynamic PRB/Regular PRB:")
+        print(f"Latency Reduction: {summary['latency_reduction']:.3f}% "
+              f"Packet Loss Reduction: {summary['packet_loss_reduction']:.3f}% "
+              f"Throughput Increase: {summary['throughput_increase']:.3f}% "
+              f"Energy Savings: {summary['energy_savings']:.3f}%")
+        kpis = getattr(self, "kpis", None)
+        if kpis is not None:
+            for method in kpis.methods:
+                print(f"{method.capitalize()} PRB KPIs:")
+                for line in kpis.format(method):
+                    print(f"  {line}")
+
+
+class SimulationRunner(MetricsSummary):
+    def __init__(self, env=None, max_time_steps=200, policy=random_policy, prb_policies=(), histories=True):
+        self.env = env if env is not None else MobileNetworkEnv()
+        self.max_time_steps = max_time_steps
+        self.policy = policy
+        self.time_step = 0
+        num_cells = len(self.env.base_stations)
+        self.dynamic_scheduler = PRBScheduler(num_cells, dynamic=True, log_path='out_cell_prb.csv')
+        self.regular_scheduler = PRBScheduler(num_cells, dynamic=False, log_path='out_cell_prb.csv')
+        # every PRB policy is derived from the same per-tick radio computation; extra policies
+        # only get summed metrics and KPIs, the trackers follow dynamic and regular
+        self.comparison = PRBComparison((DynamicPRBPolicy(self.dynamic_scheduler), PRBPolicy(self.regular_scheduler))
+                                        + tuple(prb_policies))
+        self.metrics = {policy.name: {"latency": 0, "packet_loss": 0, "throughput": 0, "energy": 0}
+                        for policy in self.comparison.policies}
+        self.dynamic_metrics = self.metrics["dynamic"]
+        self.regular_metrics = self.metrics["regular"]
+        # histories=False drops the per-UE plot histories (the GUI's), keeping the trackers' scalars
+        history_length = HISTORY_LENGTH if histories else 0
+        self.ue_trackers = [(SINRTracker(history_length), ThroughputTracker(history_length),
+                             SINRTracker(history_length), ThroughputTracker(history_length))
+                            for _ in range(len(self.env.user_equipments))]
+        # streaming per-UE / per-cell / global stats and quantiles, queryable at any time
+        self.kpis = KPIAggregator(len(self.env.user_equipments), num_cells, tuple(self.metrics))
+
+    @property
+    def done(self):
+        return self.time_step >= self.max_time_steps
+
+    def step(self):
+        with profiling.phase("step"):
+            with profiling.phase("env.step"):
+                self.env.step(self.policy(self.env))
+            with profiling.phase("metrics"):
+                self.calculate_metrics()
+        profiling.count("steps")
+        self.time_step += 1
+
+    def frame(self):
+        return capture_frame(self.env, self.time_step, self.done)
+
+    def run(self):
+        while not self.done:
+            self.step()
+        close_all()
+        return self.summary()
+
+    def calculate_metrics(self):
+        user_equipments = self.env.user_equipments
+        targets = np.array([(trackers[1].cur_min_value + trackers[1].cur_max_value) / 2 for trackers in self.ue_trackers])
+        radio, results = self.comparison.evaluate(self.env.link_budget, user_equipments, self.time_step, targets)
+
+        serving = user_equipments.serving
+        handovers = user_equipments.handover_occurred
+        for name, result in results.items():
+            values = {"latency": result.latency, "packet_loss": result.packet_loss,
+                      "throughput": result.throughput, "energy": result.energy}
+            metrics = self.metrics[name]
+            for key, value in values.items():
+                metrics[key] += value.sum()
+            self.kpis.update(name, serving, values, handovers)
+
+        with profiling.phase("metrics.trackers"):
+            sinr = radio.sinr[np.arange(len(serving)), np.maximum(serving, 0)].tolist()
+            handover_list = handovers.tolist()
+            for name, first in (("dynamic", 0), ("regular", 2)):
+                result = results[name]
+                throughput = (result.throughput + result.extra_prbs).tolist()
+                latency = result.latency.tolist()
+                packet_loss = result.packet_loss.tolist()
+                for ue_index, trackers in enumerate(self.ue_trackers):
+                    handover = handover_list[ue_index]
+                    trackers[first].record(self.time_step, sinr[ue_index], handover)
+                    trackers[first + 1].record(self.time_step, ue_index, throughput[ue_index], latency[ue_index],
+                                               packet_loss[ue_index], handover)
+
+        handovers[:] = False
@@ -0,0 +1,64 @@
+import numpy as np
+from simulation.metrics_writer import get_writer, CELL_PRB_HEADER
+
+CELL_PRBS = 100
+BASE_PRBS = 25
+BANDWIDTH_PER_PRB = 20
+HANDOVER_MARGIN = 3  # dB: a neighbour this close to the serving cell makes a handover imminent
+
+
+def imminent_handovers(state, serving, margin=HANDOVER_MARGIN):
+    # UEs whose strongest neighbour is within `margin` dB of the serving cell's SINR
+    rows = np.arange(len(serving))
+    attached = serving >= 0
+    sinr = np.where(np.isnan(state.sinr), -np.inf, state.sinr)
+    serving_sinr = np.where(attached, sinr[rows, np.maximum(serving, 0)], -np.inf)
+    neighbours = sinr.copy()
+    neighbours[rows[attached], serving[attached]] = -np.inf
+    best_neighbour = neighbours.max(axis=1) if neighbours.shape[1] else np.full(len(serving), -np.inf)
+    return attached & (best_neighbour >= serving_sinr - margin)
+
+
+class PRBScheduler:
+    # Per-tick PRB allocation across all cells at once. Every attached UE asks for
+    # base_prbs; the dynamic policy additionally gives UEs in a handover window the
+    # PRBs needed to lift their throughput to its target. Oversubscribed cells
+    # scale all of their requests down proportionally to the cell budget.
+    def __init__(self, num_cells, cell_prbs=CELL_PRBS, base_prbs=BASE_PRBS, dynamic=False, log_path=None):
+        self.num_cells = num_cells
+        self.cell_prbs = cell_prbs
+        self.base_prbs = base_prbs
+        self.dynamic = dynamic
+        self.method = "Dynamic" if dynamic else "Normal"
+        self.log_path = log_path
+        self.usage = np.zeros(num_cells)
+
+    def extra_prbs(self, throughput, sinr, target):
+        # PRBs that close the gap to the target at the UE's current spectral efficiency
+        with np.errstate(divide="ignore", invalid="ignore"):
+            extra = (target - throughput) / (BANDWIDTH_PER_PRB * np.log2(1 + sinr))
+        return np.where(np.isfinite(extra) & (extra > 0), extra, 0.0)
+
+    def schedule(self, time_step, serving, throughput=None, sinr=None, target=None, in_window=None):
+        serving = np.asarray(serving)
+        attached = serving >= 0
+        requested = np.where(attached, float(self.base_prbs), 0.0)
+        extra = np.zeros(len(serving))
+        if self.dynamic and in_window is not None:
+            extra = np.where(attached & in_window, self.extra_prbs(throughput, sinr, target), 0.0)
+            requested += extra
+
+        cells = serving[attached]
+        demand = np.bincount(cells, weights=requested[attached], minlength=self.num_cells)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scale = np.where(demand > self.cell_prbs, self.cell_prbs / demand, 1.0)
+        allocation = np.zeros(len(serving))
+        allocation[attached] = requested[attached] * scale[cells]
+        extra[attached] *= scale[cells]
+        self.usage = np.bincount(cells, weights=allocation[attached], minlength=self.num_cells)
+
+        if self.log_path is not None:
+            writer = get_writer(self.log_path, CELL_PRB_HEADER)
+            for cell, prbs in enumerate(self.usage.tolist()):
+                writer.write((cell, self.method, time_step, prbs, prbs / self.cell_prbs))
+        return allocation, extra
@@ -0,0 +1,250 @@
+import copy
+import math
+import random
+import numpy as np
+from simulation.population import UEPopulation
+
+_NONE = -1  # stands in for None in integer fields (cur_min_time_step before the first update)
+KPI_STATS_FIELDS = ("count", "mean", "m2", "min", "max")
+
+
+class Snapshot:
+    # Simulation state packed into one flat byte buffer; `layout` maps each field to
+    # (offset, dtype, shape). Base stations are static within an episode and are
+    # referenced rather than copied.
+    __slots__ = ("buffer", "layout", "base_stations")
+
+    def __init__(self, buffer, layout, base_stations):
+        self.buffer = buffer
+        self.layout = layout
+        self.base_stations = base_stations
+
+    @property
+    def nbytes(self):
+        return self.buffer.nbytes
+
+    def __contains__(self, name):
+        return name in self.layout
+
+    def __getitem__(self, name):
+        offset, dtype, shape = self.layout[name]
+        return np.frombuffer(self.buffer, dtype, math.prod(shape), offset).reshape(shape)
+
+
+class _Packer:
+    def __init__(self):
+        self.parts = []
+        self.layout = {}
+        self.offset = 0
+
+    def add(self, name, values, dtype=None):
+        values = np.asarray(values, dtype=dtype, order="C")
+        raw = values.reshape(-1).view(np.uint8)
+        # keep every field 8-byte aligned so frombuffer views stay aligned
+        padding = -len(raw) % 8
+        self.layout[name] = (self.offset, values.dtype, values.shape)
+        self.parts.append(raw)
+        if padding:
+            self.parts.append(np.zeros(padding, dtype=np.uint8))
+        self.offset += len(raw) + padding
+
+    def snapshot(self, base_stations):
+        buffer = np.concatenate(self.parts) if self.parts else np.zeros(0, dtype=np.uint8)
+        return Snapshot(buffer, self.layout, base_stations)
+
+
+def _pack_random(packer, prefix, state):
+    version, internal, gauss = state
+    packer.add(f"{prefix}state", internal, np.uint32)
+    packer.add(f"{prefix}gauss", np.nan if gauss is None else gauss, np.float64)
+
+
+def _unpack_random(snapshot, prefix):
+    gauss = float(snapshot[f"{prefix}gauss"])
+    return 3, tuple(snapshot[f"{prefix}state"].tolist()), None if np.isnan(gauss) else gauss
+
+
+def _pack_env(packer, env):
+    ues = env.user_equipments
+    for name, _ in UEPopulation.COLUMNS:
+        packer.add(f"ue.{name}", getattr(ues, name))
+    packer.add("ue.next_uid", ues.next_uid, np.int64)
+    mobility = ues.mobility
+    packer.add("mobility.key", mobility.streams.key, np.uint64)
+    packer.add("mobility.base_key", mobility.streams.base_key, np.uint64)
+    packer.add("mobility.epoch", mobility.streams.epoch, np.int64)
+    if hasattr(mobility, "speed"):
+        packer.add("mobility.speed", mobility.speed)
+        packer.add("mobility.direction", mobility.direction)
+    if hasattr(env, "current_ue_index"):
+        packer.add("env.current_ue_index", env.current_ue_index, np.int64)
+    if hasattr(env, "topology_rng"):
+        _pack_random(packer, "env.topology_rng.", env.topology_rng.getstate())
+
+
+def _pack_global_rng(packer):
+    # the link budget losses, tracker draws and the default policy use the global generators
+    _, keys, position, has_gauss, cached_gaussian = np.random.get_state()
+    packer.add("numpy.keys", keys)
+    packer.add("numpy.state", [position, has_gauss, cached_gaussian], np.float64)
+    _pack_random(packer, "random.", random.getstate())
+
+
+def restore_global_rng(snapshot):
+    position, has_gauss, cached_gaussian = snapshot["numpy.state"].tolist()
+    np.random.set_state(("MT19937", snapshot["numpy.keys"], int(position), int(has_gauss), cached_gaussian))
+    random.setstate(_unpack_random(snapshot, "random."))
+
+
+def capture(env):
+    packer = _Packer()
+    _pack_env(packer, env)
+    _pack_global_rng(packer)
+    return packer.snapshot(tuple(env.base_stations))
+
+
+def _restore_cells(env, base_stations):
+    cells = env.base_stations
+    if len(cells) == len(base_stations) and all(a is b for a, b in zip(cells, base_stations)):
+        return
+    cells.clear()
+    for bs in base_stations:
+        cells.append(bs)
+
+
+def restore(env, snapshot, global_rng=True):
+    _restore_cells(env, snapshot.base_stations)
+    ues = env.user_equipments
+    size = len(snapshot["ue.x"])
+    ues._reserve(size)
+    ues.size = size
+    for name, _ in UEPopulation.COLUMNS:
+        ues._data[name][:size] = snapshot[f"ue.{name}"]
+    ues.next_uid = int(snapshot["ue.next_uid"])
+    mobility = ues.mobility
+    mobility.streams.key = snapshot["mobility.key"][()]
+    mobility.streams.base_key = snapshot["mobility.base_key"][()]
+    mobility.streams.epoch = int(snapshot["mobility.epoch"])
+    if "mobility.speed" in snapshot:
+        mobility.speed = snapshot["mobility.speed"].copy()
+        mobility.direction = snapshot["mobility.direction"].copy()
+    if "env.current_ue_index" in snapshot:
+        env.current_ue_index = int(snapshot["env.current_ue_index"])
+    if "env.topology_rng.state" in snapshot:
+        env.topology_rng.setstate(_unpack_random(snapshot, "env.topology_rng."))
+    if global_rng:
+        restore_global_rng(snapshot)
+
+
+def clone(env, snapshot=None):
+    # independent copy of env sharing the (read-only) base stations and their link budget
+    snapshot = capture(env) if snapshot is None else snapshot
+    branch = copy.copy(env)
+    cells = copy.copy(env.base_stations)
+    cells.base_stations = list(cells.base_stations)
+    cells.index = dict(cells.index)
+    branch.base_stations = cells
+    branch.user_equipments = UEPopulation(cells, capacity=max(len(env.user_equipments), 1),
+                                          mobility=copy.deepcopy(env.user_equipments.mobility))
+    if hasattr(env, "topology_rng"):
+        branch.topology_rng = random.Random()
+    restore(branch, snapshot, global_rng=False)
+    return branch
+
+
+def fork(env, count):
+    snapshot = capture(env)
+    return [clone(env, snapshot) for _ in range(count)]
+
+
+def lookahead_action(env, actions=(0, 1), horizon=10, policy=None):
+    # Try each candidate action on a branch of env and follow it with `policy` (no handover by
+    # default) for `horizon` steps. Every branch sees the same random streams, and the caller's
+    # streams are left where they were.
+    snapshot = capture(env)
+    branch = clone(env, snapshot)
+    best_action, best_return = None, -np.inf
+    for action in actions:
+        restore(branch, snapshot)
+        total = 0.0
+        for step in range(horizon):
+            if step:
+                action_now = policy(branch) if policy is not None else np.zeros_like(action)
+            else:
+                action_now = action
+            _, reward, done, _ = branch.step(action_now)
+            total += float(np.sum(reward))
+            if done:
+                break
+        if total > best_return:
+            best_action, best_return = action, total
+    restore_global_rng(snapshot)
+    return best_action
+
+
+def capture_runner(runner):
+    # env state plus everything SimulationRunner accumulates; restoring it does not rewind
+    # rows already written to the CSV / columnar logs
+    packer = _Packer()
+    _pack_env(packer, runner.env)
+    _pack_global_rng(packer)
+    packer.add("runner.time_step", runner.time_step, np.int64)
+    for name, metrics in runner.metrics.items():
+        packer.add(f"runner.metrics.{name}", list(metrics.values()), np.float64)
+    packer.add("runner.dynamic_usage", runner.dynamic_scheduler.usage, np.float64)
+    packer.add("runner.regular_usage", runner.regular_scheduler.usage, np.float64)
+    kpis = runner.kpis
+    for (method, metric), stats in kpis.stats.items():
+        for field in KPI_STATS_FIELDS:
+            packer.add(f"kpis.stats.{method}.{metric}.{field}", getattr(stats, field), np.float64)
+    for scope, sketches in (("shared", kpis.shared_sketches), ("ue", kpis.ue_sketches)):
+        for (method, metric), sketch in sketches.items():
+            packer.add(f"kpis.{scope}.{method}.{metric}", sketch.counts)
+
+    trackers = [tracker for group in runner.ue_trackers for tracker in group]
+    scalars = np.array([[_NONE if t.cur_min_time_step is None else t.cur_min_time_step, t.cur_min_value,
+                         getattr(t, "cur_max_value", 0), getattr(t, "actual", 0), getattr(t, "latency", 0)]
+                        for t in trackers], dtype=np.float64).reshape(-1, 5)
+    packer.add("trackers.scalars", scalars)
+    histories = [(t.sinr_data if hasattr(t, "sinr_data") else t.throughput_data).view() for t in trackers]
+    packer.add("trackers.history_lengths", [len(history) for history in histories], np.int64)
+    packer.add("trackers.histories", np.concatenate(histories) if histories else [], np.float64)
+    packer.add("trackers.event_counts", [len(t.handover_events) for t in trackers], np.int64)
+    packer.add("trackers.events", [event for t in trackers for event in t.handover_events], np.int64)
+    return packer.snapshot(tuple(runner.env.base_stations))
+
+
+def restore_runner(runner, snapshot):
+    restore(runner.env, snapshot)
+    runner.time_step = int(snapshot["runner.time_step"])
+    for name, metrics in runner.metrics.items():
+        metrics.update(zip(metrics, snapshot[f"runner.metrics.{name}"].tolist()))
+    runner.dynamic_scheduler.usage = snapshot["runner.dynamic_usage"].copy()
+    runner.regular_scheduler.usage = snapshot["runner.regular_usage"].copy()
+    kpis = runner.kpis
+    for (method, metric), stats in kpis.stats.items():
+        for field in KPI_STATS_FIELDS:
+            setattr(stats, field, snapshot[f"kpis.stats.{method}.{metric}.{field}"].copy())
+    for scope, sketches in (("shared", kpis.shared_sketches), ("ue", kpis.ue_sketches)):
+        for (method, metric), sketch in sketches.items():
+            sketch.counts[:] = snapshot[f"kpis.{scope}.{method}.{metric}"]
+
+    trackers = [tracker for group in runner.ue_trackers for tracker in group]
+    scalars = snapshot["trackers.scalars"].tolist()
+    history_ends = np.cumsum(snapshot["trackers.history_lengths"]).tolist()
+    histories = snapshot["trackers.histories"]
+    event_ends = np.cumsum(snapshot["trackers.event_counts"]).tolist()
+    events = snapshot["trackers.events"].reshape(-1, 3).tolist()
+    history_start = event_start = 0
+    for tracker, (min_time_step, min_value, max_value, actual, latency), history_end, event_end in zip(
+            trackers, scalars, history_ends, event_ends):
+        tracker.cur_min_time_step = None if min_time_step == _NONE else int(min_time_step)
+        tracker.cur_min_value = min_value
+        history = tracker.sinr_data if hasattr(tracker, "sinr_data") else tracker.throughput_data
+        history.load(histories[history_start:history_end])
+        tracker.handover_events = [tuple(event) for event in events[event_start:event_end]]
+        if hasattr(tracker, "actual"):
+            tracker.cur_max_value = max_value
+            tracker.actual = int(actual)
+            tracker.latency = int(latency)
+        history_start, event_start = history_end, event_end
@@ -0,0 +1,41 @@
+import numpy as np
+from collections import defaultdict
+
+
+def _expand(start, counts):
+    # concatenate the ranges [start[i], start[i] + counts[i]) without a Python loop
+    total = int(counts.sum())
+    offsets = np.cumsum(counts) - counts
+    return np.arange(total) - np.repeat(offsets, counts) + np.repeat(start, counts)
+
+
+class SquareGrid:
+    # Axis-aligned squares of a fixed size, stored by lower-left corner.
+    def __init__(self, size=50, cell_size=None, squares=()):
+        self.size = size
+        self.cell_size = cell_size if cell_size is not None else 2 * size
+        self.squares = []
+        self.buckets = defaultdict(list)
+        for x, y in squares:
+            self.add(x, y)
+
+    def __len__(self):
+        return len(self.squares)
+
+    def _cell(self, value):
+        return int(value // self.cell_size)
+
+    def add(self, x, y):
+        self.buckets[(self._cell(x), self._cell(y))].append(len(self.squares))
+        self.squares.append((x, y))
+
+    def overlaps(self, x, y, size=None):
+        size = self.size if size is None else size
+        for cx in range(self._cell(x - self.size), self._cell(x + size) + 1):
+            for cy in range(self._cell(y - self.size), self._cell(y + size) + 1):
+                for i in self.buckets.get((cx, cy), ()):
+                    square_x, square_y = self.squares[i]
+                    if (x < square_x + self.size and x + size > square_x and
+                        y < square_y + self.size and y + size > square_y):
+                        return True
+        return False
@@ -0,0 +1,140 @@
+import argparse
+import csv
+import itertools
+import os
+import random
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+
+DEFAULTS = {
+    "num_base_stations": 5,
+    "num_squares_per_bs": 20,
+    "max_time_steps": 200,
+    "bandwidth": 20,
+    "step_size": 1.2,
+}
+PARAMETERS = tuple(DEFAULTS) + ("seed",)
+SUMMARY_KEYS = ("latency_reduction", "packet_loss_reduction", "throughput_increase", "energy_savings")
+METRIC_KEYS = ("latency", "packet_loss", "throughput", "energy")
+RESULT_COLUMNS = (PARAMETERS + SUMMARY_KEYS
+                  + tuple(f"dynamic_{key}" for key in METRIC_KEYS)
+                  + tuple(f"regular_{key}" for key in METRIC_KEYS)
+                  + ("error",))
+
+
+def scenario_grid(grid, seeds):
+    grid = {key: grid.get(key, [value]) for key, value in DEFAULTS.items()}
+    for values in itertools.product(*grid.values(), seeds):
+        yield dict(zip(PARAMETERS, values))
+
+
+def scenario_key(config):
+    return tuple(str(config[key]) for key in PARAMETERS)
+
+
+def run_scenario(config):
+    # imported here so the parent process stays light; workers pay it once
+    from simulation import metrics_writer
+    from simulation.mobility import TargetMobility
+    from simulation.network_env import MobileNetworkEnv
+    from simulation.runner import SimulationRunner
+
+    metrics_writer.set_output_format("none")
+    random.seed(config["seed"])
+    np.random.seed(config["seed"])
+    env = MobileNetworkEnv(mobility=TargetMobility(seed=config["seed"], step_size=config["step_size"]),
+                           num_base_stations=config["num_base_stations"],
+                           num_squares_per_bs=config["num_squares_per_bs"],
+                           ue_bandwidth=config["bandwidth"])
+    runner = SimulationRunner(env, max_time_steps=config["max_time_steps"], histories=False)
+    summary = runner.run()
+    avg_dynamic_metrics, avg_regular_metrics = runner.averages()
+
+    row = dict(config)
+    row.update(summary)
+    row.update({f"dynamic_{key}": float(value) for key, value in avg_dynamic_metrics.items()})
+    row.update({f"regular_{key}": float(value) for key, value in avg_regular_metrics.items()})
+    return row
+
+
+def completed_keys(results_path):
+    # failed runs keep their traceback in the "error" column and are retried on resume
+    if not os.path.isfile(results_path):
+        return set()
+    with open(results_path, newline='') as f:
+        return {scenario_key(row) for row in csv.DictReader(f) if not row.get("error")}
+
+
+def run_sweep(grid, seeds, results_path, workers=None):
+    done = completed_keys(results_path)
+    pending = [config for config in scenario_grid(grid, seeds) if scenario_key(config) not in done]
+    if not pending:
+        return 0, 0
+
+    write_header = not os.path.isfile(results_path)
+    with open(results_path, mode='a', newline='') as f, ProcessPoolExecutor(max_workers=workers) as pool:
+        writer = csv.DictWriter(f, fieldnames=RESULT_COLUMNS)
+        if write_header:
+            writer.writeheader()
+        futures = {pool.submit(run_scenario, config): config for config in pending}
+        failed = 0
+        for future in as_completed(futures):
+            error = future.exception()
+            if error is None:
+                writer.writerow(future.result())
+            else:
+                failed += 1
+                message = "".join(traceback.format_exception(type(error), error, error.__traceback__))
+                writer.writerow(dict(futures[future], error=message))
+            f.flush()
+    return len(pending), failed
+
+
+def summarize(results_path, keys=("throughput_increase", "latency_reduction")):
+    groups = {}
+    with open(results_path, newline='') as f:
+        for row in csv.DictReader(f):
+            if row.get("error"):
+                continue
+            config = tuple(row[key] for key in DEFAULTS)
+            groups.setdefault(config, []).append([float(row[key]) for key in keys])
+
+    table = []
+    for config, values in groups.items():
+        values = np.array(values)
+        mean = np.nanmean(values, axis=0)
+        std = np.nanstd(values, axis=0, ddof=1) if len(values) > 1 else np.full(len(keys), np.nan)
+        half_width = 1.96 * std / np.sqrt(len(values))
+        row = dict(zip(DEFAULTS, config), replications=len(values))
+        for key, m, h in zip(keys, mean, half_width):
+            row[f"{key}_mean"] = float(m)
+            row[f"{key}_ci95"] = float(h)
+        table.append(row)
+    return table
+
+
+def _seeds(text):
+    if "-" in text:
+        first, last = text.split("-")
+        return list(range(int(first), int(last) + 1))
+    return [int(seed) for seed in text.split(",")]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a parameter sweep over scenarios and seeds.")
+    parser.add_argument("--results", default="sweep_results.csv")
+    parser.add_argument("--seeds", type=_seeds, default=[0])
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--num-base-stations", type=int, nargs="+")
+    parser.add_argument("--num-squares-per-bs", type=int, nargs="+")
+    parser.add_argument("--max-time-steps", type=int, nargs="+")
+    parser.add_argument("--bandwidth", type=int, nargs="+")
+    parser.add_argument("--step-size", type=float, nargs="+")
+    args = parser.parse_args()
+
+    grid = {key: getattr(args, key) for key in DEFAULTS if getattr(args, key) is not None}
+    count, failed = run_sweep(grid, args.seeds, args.results, args.workers)
+    print(f"Ran {count} scenarios ({failed} failed, rerun to retry them), results in {args.results}")
+    for row in summarize(args.results):
+        print(row)
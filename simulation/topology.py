@@ -0,0 +1,165 @@
+import random
+import numpy as np
+from simulation.base_station import BaseStation
+from simulation.blockage import BlockageModel
+from simulation.coverage import CoverageMap
+from simulation.link_budget import LinkBudget
+
+
+def random_layout(num_base_stations, num_squares_per_bs):
+    # The episode layout MobileNetworkRLEnv has always drawn: sites with their
+    # obstacle squares, then one UE start/target per site. Uses the global RNGs.
+    base_stations = []
+    for i in range(num_base_stations):
+        x = random.randint(100, 3000)
+        y = random.randint(100, 3000)
+        base_station = BaseStation(x, y)
+        base_station.add_squares(num_squares_per_bs)
+        base_stations.append(base_station)
+
+    ues = []
+    for bs in base_stations:
+        for i in range(1):
+            x = bs.x - random.randint(500, 2500)
+            y = bs.y - random.randint(500, 1500)
+            target_x = random.randint(bs.x - 50, bs.x + 50)
+            target_y = random.randint(bs.y - 50, bs.y + 50)
+            ues.append((x, y, target_x, target_y))
+    return base_stations, ues
+
+
+def city_layout(num_base_stations, num_ues, size, seed=None):
+    # Sites on a jittered square grid over a size x size map and uniformly placed UEs with
+    # uniform targets, for large (partitioned) runs. No obstacle squares.
+    rng = np.random.default_rng(seed)
+    per_row = int(np.ceil(np.sqrt(num_base_stations)))
+    spacing = size / per_row
+    rows, cols = np.divmod(np.arange(num_base_stations), per_row)
+    bs_x = (cols + 0.5 + rng.uniform(-0.25, 0.25, num_base_stations)) * spacing
+    bs_y = (rows + 0.5 + rng.uniform(-0.25, 0.25, num_base_stations)) * spacing
+    base_stations = [BaseStation(int(x), int(y)) for x, y in zip(bs_x, bs_y)]
+    ue_x, ue_y, target_x, target_y = rng.uniform(0, size, (4, num_ues))
+    return base_stations, (ue_x, ue_y, target_x, target_y)
+
+
+class Topology:
+    # One frozen episode layout plus everything derived from the sites alone
+    # (link budget, blockage model, coverage maps). Cached per topology so that
+    # restoring it is a matter of pointing a CellSet at it.
+    def __init__(self, base_stations, ue_x, ue_y, target_x, target_y):
+        self.base_stations = tuple(base_stations)
+        self.index = {id(bs): i for i, bs in enumerate(self.base_stations)}
+        self.bs_x = np.array([bs.x for bs in self.base_stations], dtype=float)
+        self.bs_y = np.array([bs.y for bs in self.base_stations], dtype=float)
+        self.tx_power = np.array([bs.tx_power for bs in self.base_stations], dtype=float)
+        self.radius = np.array([bs.radius for bs in self.base_stations], dtype=float)
+        self.ue_x = np.asarray(ue_x, dtype=float)
+        self.ue_y = np.asarray(ue_y, dtype=float)
+        self.target_x = np.asarray(target_x, dtype=float)
+        self.target_y = np.asarray(target_y, dtype=float)
+        for column in (self.bs_x, self.bs_y, self.tx_power, self.radius,
+                       self.ue_x, self.ue_y, self.target_x, self.target_y):
+            column.setflags(write=False)
+        self._link_budgets = {}
+        self._blockage_model = None
+        self.coverage_maps = {}
+
+    @classmethod
+    def generate(cls, num_base_stations, num_squares_per_bs, seed):
+        random_state, np_state = random.getstate(), np.random.get_state()
+        random.seed(seed)
+        np.random.seed(seed)
+        try:
+            base_stations, ues = random_layout(num_base_stations, num_squares_per_bs)
+        finally:
+            random.setstate(random_state)
+            np.random.set_state(np_state)
+        return cls(base_stations, *np.array(ues, dtype=float).reshape(-1, 4).T)
+
+    @classmethod
+    def capture(cls, base_stations, user_equipments):
+        return cls(base_stations, user_equipments.x.copy(), user_equipments.y.copy(),
+                   user_equipments.target_x.copy(), user_equipments.target_y.copy())
+
+    def link_budget(self, candidate_radius=None, blockage=False):
+        key = (candidate_radius, blockage)
+        if key not in self._link_budgets:
+            self._link_budgets[key] = LinkBudget(self.base_stations, candidate_radius=candidate_radius,
+                                                 blockage=self.blockage_model if blockage else None)
+        return self._link_budgets[key]
+
+    @property
+    def blockage_model(self):
+        if self._blockage_model is None:
+            self._blockage_model = BlockageModel.from_base_stations(self.base_stations)
+        return self._blockage_model
+
+    def coverage_map(self, resolution):
+        if resolution not in self.coverage_maps:
+            self.coverage_maps[resolution] = CoverageMap.build(self.bs_x, self.bs_y, self.tx_power, resolution)
+        return self.coverage_maps[resolution]
+
+    def arrays(self, prefix=""):
+        squares = [square for bs in self.base_stations for square in bs.squares]
+        arrays = {
+            f"{prefix}bs_x": self.bs_x, f"{prefix}bs_y": self.bs_y, f"{prefix}tx_power": self.tx_power,
+            f"{prefix}square_counts": np.array([len(bs.squares) for bs in self.base_stations], dtype=np.int64),
+            f"{prefix}squares": np.array(squares, dtype=np.int64).reshape(-1, 2),
+            f"{prefix}ue_x": self.ue_x, f"{prefix}ue_y": self.ue_y,
+            f"{prefix}target_x": self.target_x, f"{prefix}target_y": self.target_y,
+            f"{prefix}coverage_resolutions": np.array(sorted(self.coverage_maps)),
+        }
+        for resolution, coverage_map in self.coverage_maps.items():
+            arrays.update(coverage_map.arrays(f"{prefix}coverage{resolution}_"))
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays, prefix=""):
+        squares = arrays[f"{prefix}squares"].tolist()
+        offsets = np.concatenate([[0], np.cumsum(arrays[f"{prefix}square_counts"])])
+        base_stations = []
+        for i, (x, y, tx_power) in enumerate(zip(arrays[f"{prefix}bs_x"].tolist(), arrays[f"{prefix}bs_y"].tolist(),
+                                                 arrays[f"{prefix}tx_power"].tolist())):
+            bs = BaseStation(int(x), int(y), tx_power)
+            bs.squares = [tuple(square) for square in squares[offsets[i]:offsets[i + 1]]]
+            base_stations.append(bs)
+        topology = cls(base_stations, arrays[f"{prefix}ue_x"], arrays[f"{prefix}ue_y"],
+                       arrays[f"{prefix}target_x"], arrays[f"{prefix}target_y"])
+        for resolution in arrays[f"{prefix}coverage_resolutions"].tolist():
+            topology.coverage_maps[resolution] = CoverageMap.from_arrays(arrays, f"{prefix}coverage{resolution}_")
+        return topology
+
+
+class TopologyPool:
+    # Pre-generated, seeded layouts for MobileNetworkRLEnv(topology_pool=...):
+    # reset() then restores one of these instead of placing sites and obstacles.
+    def __init__(self, topologies):
+        self.topologies = list(topologies)
+
+    @classmethod
+    def generate(cls, size, num_base_stations=5, num_squares_per_bs=20, seed=0, coverage_resolution=None):
+        topologies = [Topology.generate(num_base_stations, num_squares_per_bs, seed + i) for i in range(size)]
+        if coverage_resolution:
+            for topology in topologies:
+                topology.coverage_map(coverage_resolution)
+        return cls(topologies)
+
+    def __len__(self):
+        return len(self.topologies)
+
+    def __getitem__(self, i):
+        return self.topologies[i]
+
+    def draw(self, rng=None):
+        return (rng or random).choice(self.topologies)
+
+    def save(self, path):
+        arrays = {"count": np.array(len(self.topologies))}
+        for i, topology in enumerate(self.topologies):
+            arrays.update(topology.arrays(f"t{i}_"))
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as arrays:
+            return cls(Topology.from_arrays(arrays, f"t{i}_") for i in range(arrays["count"].item()))
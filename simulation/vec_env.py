@@ -0,0 +1,313 @@
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+from gym import spaces
+from stable_baselines3.common.vec_env import VecEnv
+from simulation import profiling
+from simulation.link_budget import LinkBudget
+from simulation.network_env import observe
+from simulation.population import UEPopulation
+from simulation.rl_environment import MobileNetworkRLEnv
+
+try:
+    import gymnasium
+except ImportError:  # stable-baselines3 < 2.0 still uses gym spaces
+    gymnasium = None
+
+
+def sb3_space(space):
+    if gymnasium is None:
+        return space
+    if isinstance(space, spaces.Discrete):
+        return gymnasium.spaces.Discrete(int(space.n))
+    if isinstance(space, spaces.MultiBinary):
+        return gymnasium.spaces.MultiBinary(space.n)
+    if isinstance(space, spaces.Box):
+        return gymnasium.spaces.Box(low=space.low, high=space.high, dtype=space.dtype)
+    return space
+
+
+class _EnvShard:
+    # Steps a contiguous slice of environments, writing into caller-owned buffers.
+    # Each environment owns `agents` consecutive slots (one per UE in "all" mode).
+    # Where the environments allow it (see _stack), their UE columns are views into one
+    # stacked population, and a step moves and evaluates all of them in one batched pass.
+    def __init__(self, envs, obs, rewards, dones, max_episode_steps=None, agents=1):
+        self.envs = envs
+        self.agents = agents
+        self.obs = obs.reshape((len(envs), agents) + obs.shape[1:])
+        self.rewards = rewards.reshape(len(envs), agents)
+        self.dones = dones.reshape(len(envs), agents)
+        self.max_episode_steps = max_episode_steps
+        self.episode_steps = np.zeros(len(envs), dtype=np.int64)
+        self.batch = None
+        self._stack()
+
+    def _stack(self):
+        # only for environments that step alike: same classes, stateless mobility (GaussMarkov
+        # keeps per-uid state), no blockage and one shared link rng; the mobility and cell
+        # parameters come from the shared env_kwargs
+        self.batch = None
+        first = self.envs[0]
+        mobility = first.user_equipments.mobility
+        if hasattr(mobility, "speed") or any(
+                type(env) is not type(first) or type(env.user_equipments.mobility) is not type(mobility)
+                or env.link_budget.blockage is not None or env.link_budget.rng is not first.link_budget.rng
+                for env in self.envs):
+            return False
+        populations = [env.user_equipments for env in self.envs]
+        self.counts = np.array([len(ues) for ues in populations])
+        self.starts = np.cumsum(self.counts) - self.counts
+        batch = UEPopulation(capacity=int(self.counts.sum()))
+        for ues in populations:
+            batch.import_rows(ues.export_rows(slice(None)))
+        for ues, start in zip(populations, self.starts):
+            ues.share(batch, start)
+        self.batch = batch
+        self.budgets = None
+        return True
+
+    def _batched(self):
+        # a population that outgrew its rows (or shrank, e.g. reset with fewer UEs) is re-stacked
+        base = self.batch.x.base if self.batch is not None else None
+        if base is not None and all(env.user_equipments.x.base is base and len(env.user_equipments) == count
+                                    for env, count in zip(self.envs, self.counts)):
+            return True
+        return self._stack()
+
+    def _link_budget(self):
+        budgets = [env.link_budget for env in self.envs]
+        if self.budgets is None or any(a is not b for a, b in zip(budgets, self.budgets)):
+            if len({len(budget) for budget in budgets}) > 1:
+                return None
+            self.budgets = budgets
+            self.stacked_budget = LinkBudget.stack(budgets, self.counts)
+        return self.stacked_budget
+
+    def _step_batch(self, actions):
+        # env.step for every environment at once; the link rng draws come in the same order as
+        # stepping the environments one by one, as long as none of them resets in between
+        link_budget = self._link_budget()
+        if link_budget is None:
+            return None
+        ues = self.batch
+        current = self.starts + [env.current_ue_index for env in self.envs]
+        requested = np.flatnonzero(actions.reshape(-1) == 1) if self.agents > 1 else current[actions[:, 0] == 1]
+        with profiling.phase("handover"):
+            if len(requested):
+                best = link_budget.strongest(ues.x, ues.y)[requested]
+                changed = (best >= 0) & (best != ues.serving[requested])
+                ues.serving[requested[changed]] = best[changed]
+                ues.handover_occurred[requested[changed]] = True
+                profiling.count("handovers", int(np.count_nonzero(changed)))
+
+        with profiling.phase("mobility"):
+            keys = np.repeat([env.user_equipments.mobility.streams.key for env in self.envs], self.counts)
+            rows = np.arange(len(ues))
+            self.envs[0].user_equipments.mobility.stacked(keys, ues.uid).move(ues, rows, rows, ues.moves)
+            ues.moves[:] += 1
+        with profiling.phase("link_budget"):
+            link_budget.update(ues)
+
+        states = observe(ues)
+        rewards = self.envs[0].calculate_reward(ues.throughput)
+        if self.agents > 1:
+            obs = np.split(states, self.starts[1:])
+            rewards = np.split(rewards.astype(np.float32), self.starts[1:])
+        else:
+            obs = states[current]
+            rewards = rewards[self.starts + self.counts - 1]
+        return zip(obs, rewards, [env.check_done() for env in self.envs], [{}] * len(self.envs))
+
+    def reset(self):
+        for i, env in enumerate(self.envs):
+            self.obs[i] = env.reset()
+        self.episode_steps[:] = 0
+
+    def step(self, actions):
+        infos = []
+        actions = np.asarray(actions).reshape(len(self.envs), self.agents)
+        self.episode_steps += 1
+        results = self._step_batch(actions) if self._batched() else None
+        if results is None:
+            results = (env.step(actions[i] if self.agents > 1 else actions[i, 0]) for i, env in enumerate(self.envs))
+        for i, (env, (obs, reward, done, info)) in enumerate(zip(self.envs, results)):
+            truncated = self.max_episode_steps is not None and self.episode_steps[i] >= self.max_episode_steps
+            agent_infos = [dict(info) for _ in range(self.agents)]
+            if done or truncated:
+                terminal = np.reshape(obs, (self.agents,) + self.obs.shape[2:])
+                for agent, agent_info in enumerate(agent_infos):
+                    agent_info["terminal_observation"] = terminal[agent]
+                    if truncated and not done:
+                        agent_info["TimeLimit.truncated"] = True
+                obs = env.reset()
+                self.episode_steps[i] = 0
+            self.obs[i] = obs
+            self.rewards[i] = reward
+            self.dones[i] = done or truncated
+            infos.extend(agent_infos)
+        return infos
+
+    def seed(self, seeds):
+        return [env.seed(seed) for env, seed in zip(self.envs, seeds)]
+
+    def get_attr(self, attr_name, indices):
+        return [getattr(self.envs[i], attr_name) for i in indices]
+
+    def set_attr(self, attr_name, value, indices):
+        for i in indices:
+            setattr(self.envs[i], attr_name, value)
+
+    def env_method(self, method_name, args, kwargs, indices):
+        return [getattr(self.envs[i], method_name)(*args, **kwargs) for i in indices]
+
+
+def _attach(names, num_slots, obs_shape, start, stop):
+    blocks = [shared_memory.SharedMemory(name=name) for name in names]
+    obs = np.ndarray((num_slots,) + obs_shape, dtype=np.float32, buffer=blocks[0].buf)[start:stop]
+    rewards = np.ndarray((num_slots,), dtype=np.float32, buffer=blocks[1].buf)[start:stop]
+    dones = np.ndarray((num_slots,), dtype=bool, buffer=blocks[2].buf)[start:stop]
+    return blocks, obs, rewards, dones
+
+
+def _shard_worker(remote, parent_remote, names, num_slots, obs_shape, start, stop, env_kwargs, max_episode_steps, agents):
+    parent_remote.close()
+    blocks, obs, rewards, dones = _attach(names, num_slots, obs_shape, start * agents, stop * agents)
+    shard = _EnvShard([MobileNetworkRLEnv(**env_kwargs) for _ in range(start, stop)],
+                      obs, rewards, dones, max_episode_steps, agents)
+    try:
+        while True:
+            command, args = remote.recv()
+            if command == "close":
+                break
+            remote.send(getattr(shard, command)(*args))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        del obs, rewards, dones
+        for block in blocks:
+            block.close()
+        remote.close()
+
+
+class MobileNetworkVecEnv(VecEnv):
+    # N independent MobileNetworkRLEnv instances stepped in lockstep. Observations,
+    # rewards and dones live in one preallocated array each; with num_shards > 1
+    # those arrays are shared memory and each worker process fills its own slice.
+    # With observation_mode="all" every UE is exposed as its own agent slot, so
+    # num_envs counts UEs across all instances.
+    def __init__(self, num_instances, env_kwargs=None, num_shards=1, max_episode_steps=None, start_method=None):
+        env_kwargs = env_kwargs or {}
+        probe = MobileNetworkRLEnv(**env_kwargs) if num_shards > 1 else None
+        envs = [] if num_shards > 1 else [MobileNetworkRLEnv(**env_kwargs) for _ in range(num_instances)]
+        template = probe if probe is not None else envs[0]
+        observation_space = template.observation_space
+        action_space = template.action_space
+        self.agents = 1
+        if template.observation_mode == "all":
+            self.agents = observation_space.shape[0]
+            observation_space = spaces.Box(low=observation_space.low[0], high=observation_space.high[0], dtype=np.float32)
+            action_space = spaces.Discrete(2)
+        self.num_instances = num_instances
+        num_envs = num_instances * self.agents
+        super().__init__(num_envs, sb3_space(observation_space), sb3_space(action_space))
+
+        obs_shape = observation_space.shape
+        self.num_shards = max(1, min(num_shards, num_instances))
+        self.instance_bounds = np.linspace(0, num_instances, self.num_shards + 1).astype(int)
+        self.bounds = self.instance_bounds * self.agents
+        self._actions = None
+        self._blocks = []
+        self._remotes = []
+        self._processes = []
+        self.closed = False
+
+        if self.num_shards == 1:
+            self.obs = np.zeros((num_envs,) + obs_shape, dtype=np.float32)
+            self.rewards = np.zeros(num_envs, dtype=np.float32)
+            self.dones = np.zeros(num_envs, dtype=bool)
+            self._shard = _EnvShard(envs, self.obs, self.rewards, self.dones, max_episode_steps, self.agents)
+            return
+
+        sizes = (num_envs * int(np.prod(obs_shape)) * 4, num_envs * 4, num_envs)
+        self._blocks = [shared_memory.SharedMemory(create=True, size=size) for size in sizes]
+        names = [block.name for block in self._blocks]
+        self.obs = np.ndarray((num_envs,) + obs_shape, dtype=np.float32, buffer=self._blocks[0].buf)
+        self.rewards = np.ndarray((num_envs,), dtype=np.float32, buffer=self._blocks[1].buf)
+        self.dones = np.ndarray((num_envs,), dtype=bool, buffer=self._blocks[2].buf)
+
+        if start_method is None:
+            start_method = "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
+        ctx = mp.get_context(start_method)
+        for start, stop in zip(self.instance_bounds[:-1], self.instance_bounds[1:]):
+            remote, work_remote = ctx.Pipe()
+            process = ctx.Process(target=_shard_worker, daemon=True,
+                                  args=(work_remote, remote, names, num_envs, obs_shape, int(start), int(stop),
+                                        env_kwargs, max_episode_steps, self.agents))
+            process.start()
+            work_remote.close()
+            self._remotes.append(remote)
+            self._processes.append(process)
+
+    def _call(self, command, shard_args):
+        if self.num_shards == 1:
+            return [getattr(self._shard, command)(*shard_args[0])]
+        for remote, args in zip(self._remotes, shard_args):
+            remote.send((command, args))
+        return [remote.recv() for remote in self._remotes]
+
+    def _split(self, values):
+        return [(values[start:stop],) for start, stop in zip(self.bounds[:-1], self.bounds[1:])]
+
+    def _by_shard(self, indices):
+        # agent slot indices -> per-shard local environment indices
+        indices = [i // self.agents for i in self._get_indices(indices)]
+        shard_of = np.searchsorted(self.instance_bounds, indices, side="right") - 1
+        return [[int(i - self.instance_bounds[shard]) for i, s in zip(indices, shard_of) if s == shard]
+                for shard in range(self.num_shards)]
+
+    def reset(self):
+        self._call("reset", [()] * self.num_shards)
+        return self.obs.copy()
+
+    def step_async(self, actions):
+        self._actions = np.asarray(actions).reshape(self.num_envs, -1).squeeze(-1)
+
+    def step_wait(self):
+        infos = [info for shard_infos in self._call("step", self._split(self._actions)) for info in shard_infos]
+        return self.obs.copy(), self.rewards.copy(), self.dones.copy(), infos
+
+    def seed(self, seed=None):
+        seeds = [None if seed is None else seed + i for i in range(self.num_instances)]
+        shard_seeds = [(seeds[start:stop],) for start, stop in zip(self.instance_bounds[:-1], self.instance_bounds[1:])]
+        return [value for values in self._call("seed", shard_seeds) for value in values]
+
+    def get_attr(self, attr_name, indices=None):
+        per_shard = self._by_shard(indices)
+        results = self._call("get_attr", [(attr_name, local) for local in per_shard])
+        return [value for values in results for value in values]
+
+    def set_attr(self, attr_name, value, indices=None):
+        per_shard = self._by_shard(indices)
+        self._call("set_attr", [(attr_name, value, local) for local in per_shard])
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        per_shard = self._by_shard(indices)
+        results = self._call("env_method", [(method_name, method_args, method_kwargs, local) for local in per_shard])
+        return [value for values in results for value in values]
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False] * len(self._get_indices(indices))
+
+    def close(self):
+        if self.closed:
+            return
+        for remote in self._remotes:
+            remote.send(("close", ()))
+        for process in self._processes:
+            process.join()
+        self.obs = self.rewards = self.dones = None
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self.closed = True